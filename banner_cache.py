@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+CACHE_PATH = "banner_cache.json"
+DEFAULT_MAX_ENTRIES = 2000
+
+# Banners whose fingerprints differ in at most this many bits count as the same banner.
+# Two titles on the same banner template can differ in only a few bits, so only exact matches by default.
+DEFAULT_MAX_DISTANCE = 0
+
+# Size (width, height) of the brightness thumbnail the fingerprint is taken from:
+# about one cell per character of a title, so a different title changes many bits
+FINGERPRINT_SIZE = (65, 16)
+FINGERPRINT_BITS = (FINGERPRINT_SIZE[0] - 1) * FINGERPRINT_SIZE[1]
+
+# Minimum EasyOCR confidence of every text box before a result is cached
+DEFAULT_MIN_CONFIDENCE = 0.6
+
+# Thumbnails with less brightness range than this are too flat to fingerprint
+# reliably (an empty region would hash to all zeros)
+MIN_CONTRAST = 8.0
+
+
+def fingerprint(img_np):
+    """
+    Computes a 1024-bit difference hash (dHash) of an image.
+
+    The image is reduced to a 65x16 brightness thumbnail by block averaging and
+    each bit records whether a pixel is brighter than its right neighbour.
+
+    Returns:
+        The hash as an int, or None if the image is too flat to fingerprint.
+    """
+    width, height = FINGERPRINT_SIZE
+    gray = img_np
+    if img_np.ndim == 3:
+        gray = cv2.cvtColor(img_np, cv2.COLOR_BGRA2GRAY if img_np.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+    h, w = gray.shape
+    if h >= height and w >= width:
+        # Cropped to whole cells, INTER_AREA is a plain block average (and takes its fast path)
+        gray = gray[:h - h % height, :w - w % width]
+    thumb = cv2.resize(gray, FINGERPRINT_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+    if thumb.max() - thumb.min() < MIN_CONTRAST:
+        return None
+
+    bits = (thumb[:, 1:] > thumb[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+class BannerCache:
+    """Disk-backed LRU cache from event banner fingerprints to recognized event titles."""
+
+    def __init__(self, path=CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES, max_distance=DEFAULT_MAX_DISTANCE):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.entries = OrderedDict()
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Reads cached entries from disk, if the cache file exists."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # Stored oldest first, so insertion order restores the LRU order
+            stale = 0
+            for key, title in data.get("entries", []):
+                # Fingerprints of another size were written by an older version
+                if len(key) != FINGERPRINT_BITS // 4:
+                    stale += 1
+                    continue
+                self.entries[int(key, 16)] = title
+            if stale:
+                print(f"Dropped {stale} banner cache entries with an outdated fingerprint format")
+            print(f"Loaded {len(self.entries)} cached event banners from {self.path}")
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, ValueError, AttributeError) as e:
+            print(f"Ignoring unreadable banner cache {self.path}: {e}")
+
+    def save(self):
+        """Writes the cache to disk if it changed since the last save."""
+        with self.lock:
+            if not self.dirty:
+                return
+            data = {"entries": [[f"{key:0{FINGERPRINT_BITS // 4}x}", title] for key, title in self.entries.items()]}
+            self.dirty = False
+
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save banner cache: {e}")
+
+    def get(self, key, accept=None):
+        """
+        Looks up the title of a banner by fingerprint.
+
+        Args:
+            key (int): Fingerprint from fingerprint(), or None.
+            accept (callable): Called with a cached title; titles it rejects
+                (e.g. events of another character) count as misses.
+
+        Returns:
+            The cached event title, or None if the banner hasn't been seen.
+        """
+        if key is None:
+            self.misses += 1
+            return None
+        with self.lock:
+            title = self.entries.get(key)
+            if title is None and self.max_distance:
+                for cached_key, cached_title in self.entries.items():
+                    if bin(cached_key ^ key).count("1") <= self.max_distance:
+                        key, title = cached_key, cached_title
+                        break
+
+            if title is None or (accept is not None and not accept(title)):
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return title
+
+    def put(self, key, title):
+        """Caches the title for a banner, evicting the least recently used entries if full."""
+        if key is None:
+            return
+        with self.lock:
+            self.entries[key] = title
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.dirty = True
@@ -0,0 +1,192 @@
+import argparse
+import glob
+import json
+import os
+
+import cv2
+import numpy as np
+
+from screen_capture import load_bgra
+
+DETECTOR_PATH = "banner_detector.json"
+
+# Size (width, height) the region is shrunk to before any feature is computed
+THUMBNAIL_SIZE = (64, 16)
+
+# Hue and saturation bins of the color histogram
+HISTOGRAM_BINS = (8, 4)
+
+# Brightness step (0-255) between neighbouring thumbnail pixels that counts as an edge
+EDGE_LEVEL = 24
+
+
+def features(img_bgra):
+    """
+    Computes the detector's features on a captured region.
+
+    Returns:
+        A tuple of (edge density, color histogram): the fraction of thumbnail
+        pixels on a horizontal brightness edge, and a normalized hue/saturation
+        histogram as a float32 array.
+    """
+    # A bilinear resize to twice the size and a Gaussian pyramid step; INTER_AREA is many times slower
+    width, height = THUMBNAIL_SIZE
+    thumb = cv2.pyrDown(cv2.resize(img_bgra, (2 * width, 2 * height), interpolation=cv2.INTER_LINEAR))
+    gray = cv2.cvtColor(thumb, cv2.COLOR_BGRA2GRAY)
+    edges = np.abs(np.diff(gray.astype(np.int16), axis=1)) > EDGE_LEVEL
+    hsv = cv2.cvtColor(cv2.cvtColor(thumb, cv2.COLOR_BGRA2BGR), cv2.COLOR_BGR2HSV)
+    histogram = cv2.calcHist([hsv], [0, 1], None, list(HISTOGRAM_BINS), [0, 180, 0, 256]).ravel()
+    return float(edges.mean()), histogram / histogram.sum()
+
+
+def split_threshold(present, absent):
+    """
+    A threshold that separates the present samples (above it) from the absent ones.
+
+    Halfway between the two classes where they don't overlap, halfway between
+    their means where they do, and half the weakest present sample without any
+    absent samples. A feature that isn't higher with a banner is ignored (0).
+    """
+    if not absent:
+        return min(present) / 2
+    if min(present) > max(absent):
+        return (min(present) + max(absent)) / 2
+    present_mean = sum(present) / len(present)
+    absent_mean = sum(absent) / len(absent)
+    if present_mean <= absent_mean:
+        return 0.0
+    return (present_mean + absent_mean) / 2
+
+
+class BannerDetector:
+    """
+    Decides whether the event region holds an event banner, well before OCR would.
+
+    A banner has text on it, so plenty of edges, and the game's banner colors.
+    The region is shrunk to a small thumbnail and both its edge density and how
+    much its color histogram overlaps the banners' are compared to thresholds
+    calibrated from sample frames with and without a banner.
+    """
+
+    def __init__(self, reference, edge_threshold, color_threshold):
+        self.reference = np.asarray(reference, dtype=np.float32)
+        self.edge_threshold = float(edge_threshold)
+        self.color_threshold = float(color_threshold)
+
+    def color_similarity(self, histogram):
+        """Overlap (0-1) of a normalized histogram with the banners' histogram."""
+        return float(np.minimum(histogram, self.reference).sum())
+
+    def is_present(self, img_bgra):
+        """Whether the region looks like it holds a banner."""
+        edge_density, histogram = features(img_bgra)
+        return edge_density >= self.edge_threshold and self.color_similarity(histogram) >= self.color_threshold
+
+    @classmethod
+    def calibrate(cls, present, absent):
+        """
+        Fits a detector to sample regions.
+
+        Args:
+            present (list): BGRA regions showing a banner.
+            absent (list): BGRA regions without one (may be empty).
+        """
+        present_features = [features(img) for img in present]
+        absent_features = [features(img) for img in absent]
+        reference = np.mean([histogram for _, histogram in present_features], axis=0)
+        detector = cls(reference, 0.0, 0.0)
+
+        detector.edge_threshold = split_threshold([edges for edges, _ in present_features],
+                                                  [edges for edges, _ in absent_features])
+        detector.color_threshold = split_threshold(
+            [detector.color_similarity(histogram) for _, histogram in present_features],
+            [detector.color_similarity(histogram) for _, histogram in absent_features])
+        return detector
+
+    def save(self, path=DETECTOR_PATH):
+        with open(path, "w") as f:
+            json.dump({
+                "reference_histogram": [round(float(v), 6) for v in self.reference],
+                "edge_threshold": self.edge_threshold,
+                "color_threshold": self.color_threshold,
+            }, f, indent=4)
+
+    @classmethod
+    def load(cls, path=DETECTOR_PATH):
+        """Reads a calibrated detector, or returns None if there isn't a usable one at path."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            detector = cls(data["reference_histogram"], data["edge_threshold"], data["color_threshold"])
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            print(f"Could not load the banner detector from {path}: {e}")
+            return None
+        if detector.reference.shape != (HISTOGRAM_BINS[0] * HISTOGRAM_BINS[1],):
+            print(f"{path} was calibrated with a different histogram size; recalibrate it.")
+            return None
+        return detector
+
+
+def create_detector(settings):
+    """Loads the banner detector named in settings.json, if it has been calibrated."""
+    if not settings.get('banner_detector', True):
+        return None
+    return BannerDetector.load(settings.get('banner_detector_path', DETECTOR_PATH))
+
+
+def load_samples(paths, region):
+    """
+    Reads sample images as event-region crops. Images the size of the region are
+    taken as crops already; anything else is a screenshot the region is cut from.
+    """
+    samples = []
+    for path in paths:
+        img = load_bgra(path)
+        if img.shape[:2] != (region['height'], region['width']):
+            img = img[region['top']:region['top'] + region['height'], region['left']:region['left'] + region['width']]
+        samples.append(img)
+    return samples
+
+
+def expand(paths):
+    """Expands directories into the images inside them, in name order."""
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*"))) if os.path.isdir(path) else [path])
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the banner detector from sample screenshots or crops.")
+    parser.add_argument("--present", nargs="+", required=True, help="Images (or folders) with an event banner")
+    parser.add_argument("--absent", nargs="*", default=[], help="Images (or folders) without one")
+    parser.add_argument("--settings", default="settings.json", help="Settings file with the event region")
+    parser.add_argument("--output", help="Where to write the calibration (default: banner_detector_path)")
+    args = parser.parse_args()
+
+    with open(args.settings, "r") as f:
+        settings = json.load(f)
+    region = settings.get('event_region')
+    if not region:
+        parser.error("No event_region in the settings; run the setup first.")
+
+    present = load_samples(expand(args.present), region)
+    absent = load_samples(expand(args.absent), region)
+    if not present:
+        parser.error("No sample images with a banner.")
+
+    detector = BannerDetector.calibrate(present, absent)
+    hits = sum(detector.is_present(img) for img in present)
+    false_alarms = sum(detector.is_present(img) for img in absent)
+    print(f"Edge threshold {detector.edge_threshold:.3f}, color threshold {detector.color_threshold:.3f}")
+    print(f"Banners detected: {hits}/{len(present)}, false detections: {false_alarms}/{len(absent)}")
+
+    output = args.output or settings.get('banner_detector_path', DETECTOR_PATH)
+    detector.save(output)
+    print(f"Saved the banner detector to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from database import EventStore, create_schema
+from event_bundle import EventBundle, write_bundle
+
+# The lookup as it was before the index: an OR the planner can only answer with a table scan
+LEGACY_EVENT_QUERY = """
+    SELECT "option_number", "outcome_description"
+    FROM events
+    WHERE ("character_name" = ? OR "character_name" = 'Common')
+      AND "event_title" = ?
+    ORDER BY "option_number"
+"""
+
+
+def build_synthetic_db(db_path, num_characters, events_per_character, common_events, options=3):
+    """
+    Fills a fresh database with made-up events for many characters plus "Common".
+
+    Returns:
+        A list of (character_name, event_title) pairs that exist in the database.
+    """
+    con = sqlite3.connect(db_path)
+    cur = con.cursor()
+    create_schema(cur)
+
+    keys = []
+    rows = []
+    for c in range(num_characters):
+        character_name = f"Character {c:05d}"
+        for e in range(events_per_character):
+            event_title = f"Event {e:03d} of {character_name}"
+            keys.append((character_name, event_title))
+            for o in range(1, options + 1):
+                rows.append((character_name, event_title, o, f"Option {o} -> Speed +{o * 5}"))
+
+    for e in range(common_events):
+        event_title = f"Common Event {e:04d}"
+        for o in range(1, options + 1):
+            rows.append(("Common", event_title, o, f"Option {o} -> Energy +{o * 10}"))
+
+    cur.executemany("INSERT INTO events VALUES (?, ?, ?, ?)", rows)
+    con.commit()
+    con.close()
+    print(f"Built synthetic DB with {num_characters} characters and {len(rows)} rows.")
+    return keys
+
+
+def copy_without_index(db_path, legacy_path):
+    """Copies the database without the lookup index, as databases were before it existed."""
+    src = sqlite3.connect(db_path)
+    dst = sqlite3.connect(legacy_path)
+    try:
+        src.backup(dst)
+        dst.execute("DROP INDEX IF EXISTS idx_events_key")
+        dst.commit()
+    finally:
+        dst.close()
+        src.close()
+
+
+def legacy_lookup(db_path, event_title, character_name):
+    """The previous lookup: a new connection and the OR query per call, on an unindexed database."""
+    con = sqlite3.connect(db_path)
+    try:
+        return con.execute(LEGACY_EVENT_QUERY, (character_name, event_title)).fetchall()
+    finally:
+        con.close()
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def time_lookups(label, lookup, queries):
+    timings = []
+    for character_name, event_title in queries:
+        start = time.perf_counter()
+        lookup(event_title, character_name)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    print(f"{label:<28} p50 {percentile(timings, 50):8.1f} us   p99 {percentile(timings, 99):8.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event lookups on a synthetic database.")
+    parser.add_argument("--characters", type=int, default=3000)
+    parser.add_argument("--events", type=int, default=40, help="Events per character")
+    parser.add_argument("--common", type=int, default=300, help="Number of 'Common' events")
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--no-index", action="store_true", help="Drop the lookup index to compare")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_events.db")
+        keys = build_synthetic_db(db_path, args.characters, args.events, args.common)
+
+        if args.no_index:
+            con = sqlite3.connect(db_path)
+            con.execute("DROP INDEX IF EXISTS idx_events_key")
+            con.close()
+
+        rng = random.Random(0)
+        queries = [rng.choice(keys) for _ in range(args.lookups)]
+        # Mix in misses, like OCR text that isn't an event title
+        queries += [(rng.choice(keys)[0], "Not An Event") for _ in range(args.lookups // 10)]
+        rng.shuffle(queries)
+
+        store = EventStore(db_path)
+        time_lookups("EventStore (persistent)", store.get_event_outcomes, queries)
+        store.close()
+
+        bundle_path = os.path.join(tmp, "bench_events.bundle")
+        write_bundle(db_path, bundle_path)
+        bundle = EventBundle(bundle_path, db_path=db_path)
+        time_lookups("EventBundle (mmap)", bundle.get_event_outcomes, queries)
+        for character_name, event_title in queries[:200]:
+            assert bundle.get_event_outcomes(event_title, character_name) == \
+                store.get_event_outcomes(event_title, character_name)
+        bundle.close()
+
+        legacy_path = os.path.join(tmp, "bench_events_legacy.db")
+        copy_without_index(db_path, legacy_path)
+        time_lookups("connect per lookup (legacy)", lambda t, c: legacy_lookup(legacy_path, t, c), queries)
+
+
+if __name__ == "__main__":
+    main()
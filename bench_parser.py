@@ -0,0 +1,75 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+from make_db import parse_event_page_bs4, parse_event_page_lxml
+
+
+def collect_pages(paths):
+    """Expands directories into the .html files they contain."""
+    pages = []
+    for path in paths:
+        if os.path.isdir(path):
+            pages.extend(sorted(glob.glob(os.path.join(path, "*.html"))))
+        else:
+            pages.append(path)
+    return pages
+
+
+def time_parser(parse, page_source, repeats):
+    """Returns the rows of the last run and the best time (in ms) over `repeats` runs."""
+    best = float("inf")
+    rows = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        rows = parse(page_source, "Benchmark", verbose=False)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return rows, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the BeautifulSoup and lxml event page parsers.")
+    parser.add_argument("pages", nargs="*", default=["debug_page.html"],
+                        help="Saved pages, or directories of them (default: debug_page.html)")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per page and parser; the best is kept")
+    args = parser.parse_args()
+
+    pages = collect_pages(args.pages)
+    if not pages:
+        parser.error("No pages to parse.")
+
+    total_bs4 = total_lxml = 0.0
+    mismatches = 0
+    print(f"{'page':<40}{'rows':>6}{'bs4':>11}{'lxml':>11}{'speedup':>9}")
+    for path in pages:
+        with open(path, "r", encoding="utf-8") as f:
+            page_source = f.read()
+
+        bs4_rows, bs4_ms = time_parser(parse_event_page_bs4, page_source, args.repeats)
+        lxml_rows, lxml_ms = time_parser(parse_event_page_lxml, page_source, args.repeats)
+        total_bs4 += bs4_ms
+        total_lxml += lxml_ms
+
+        if lxml_rows != bs4_rows:
+            mismatches += 1
+            print(f"MISMATCH in {path}: bs4 gave {len(bs4_rows)} rows, lxml gave {len(lxml_rows)}")
+            for expected, actual in zip(bs4_rows, lxml_rows):
+                if expected != actual:
+                    print(f"  first difference:\n    bs4:  {expected}\n    lxml: {actual}")
+                    break
+
+        print(f"{os.path.basename(path):<40}{len(bs4_rows):>6}{bs4_ms:>8.1f} ms{lxml_ms:>8.1f} ms"
+              f"{bs4_ms / lxml_ms if lxml_ms else 0.0:>8.1f}x")
+
+    print(f"\nTotal: bs4 {total_bs4:.1f} ms, lxml {total_lxml:.1f} ms "
+          f"({total_bs4 / total_lxml if total_lxml else 0.0:.1f}x faster)")
+    if mismatches:
+        print(f"{mismatches} of {len(pages)} pages parsed differently.")
+        sys.exit(1)
+    print(f"Output identical on all {len(pages)} pages.")
+
+
+if __name__ == "__main__":
+    main()
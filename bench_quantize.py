@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import re
+import time
+
+from ocr_backends import EasyOcrBackend
+from ocr_logic import DEFAULT_MIN_TEXT_CONFIDENCE
+from ocr_warmup import create_reader, warm_up
+from preprocess import Preprocessor
+from replay_bench import percentile
+from screen_capture import load_bgra
+from title_index import edit_distance
+
+
+def load_crops(path):
+    """
+    Reads a labelled crop manifest: JSON with a "crops" list of {"path": ..., "text": ...},
+    where text is the event title shown in the crop. Paths are relative to the manifest.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    return [(load_bgra(os.path.join(base, crop["path"])), crop["text"]) for crop in manifest["crops"]]
+
+
+def read_crop(backend, img_bgra):
+    """Reads one crop through the EasyOCR backend OcrEngine uses and returns the cleaned text."""
+    img, has_contrast = backend.prepare(img_bgra)
+    if not has_contrast:
+        return ""
+    results = backend.read([img])[0]
+    return re.sub(r'[^a-zA-Z0-9\s]', '', ' '.join(res[1] for res in results)).strip()
+
+
+def run_config(settings, crops, repeats):
+    """Loads a reader with the given model options and times it over every crop."""
+    load_start = time.perf_counter()
+    reader = create_reader(settings)
+    warm_up(reader)
+    load_s = time.perf_counter() - load_start
+
+    backend = EasyOcrBackend(reader, Preprocessor(settings.get('preprocess')), settings.get('ocr_mode', "recognize"),
+                             settings.get('min_text_confidence', DEFAULT_MIN_TEXT_CONFIDENCE))
+    latencies = []
+    exact = 0
+    char_errors = 0
+    char_total = 0
+    for img, expected in crops:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            text = read_crop(backend, img)
+            latencies.append((time.perf_counter() - start) * 1000)
+        exact += text == expected
+        char_errors += edit_distance(text, expected)
+        char_total += len(expected)
+
+    latencies.sort()
+    return {
+        "load_s": load_s,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "mean_ms": sum(latencies) / len(latencies),
+        "exact_match": exact / len(crops),
+        "char_error_rate": char_errors / char_total if char_total else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fp32 and int8-quantized EasyOCR on labelled banner crops.")
+    parser.add_argument("manifest", help="Crop manifest JSON (see load_crops)")
+    parser.add_argument("--settings", default="settings.json", help="Settings file with ocr_mode and preprocessing")
+    parser.add_argument("--threads", type=int, nargs="+", help="torch thread counts to try (default: from settings)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed reads per crop")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    with open(args.settings, "r") as f:
+        settings = json.load(f)
+    crops = load_crops(args.manifest)
+    if not crops:
+        parser.error("The manifest has no crops.")
+
+    thread_counts = args.threads or [settings.get('torch_threads', 0)]
+    rows = []
+    for threads in thread_counts:
+        for quantize in (False, True):
+            config = dict(settings, ocr_quantize=quantize, torch_threads=threads)
+            result = run_config(config, crops, args.repeats)
+            result.update(model="int8" if quantize else "fp32", threads=threads)
+            rows.append(result)
+
+    print(f"\n{len(crops)} crops, {args.repeats} reads each, ocr_mode {settings.get('ocr_mode', 'recognize')}")
+    print(f"{'model':<6}{'threads':>8}{'load':>9}{'p50':>10}{'p95':>10}{'exact':>8}{'CER':>8}")
+    for row in rows:
+        print(f"{row['model']:<6}{row['threads'] or 'auto':>8}{row['load_s']:>8.1f}s{row['p50_ms']:>7.1f} ms"
+              f"{row['p95_ms']:>7.1f} ms{row['exact_match']:>8.1%}{row['char_error_rate']:>8.1%}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
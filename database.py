@@ -1,10 +1,218 @@
+import os
 import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+DB_PATH = "umamusume_events.db"
+
+# Bytes of the database file SQLite may memory-map for reads
+MMAP_SIZE = 256 * 1024 * 1024
+
+# This query looks for an event matching the specific character OR a "Common" event.
+# Written as an IN list so SQLite can serve both halves from idx_events_key.
+EVENT_QUERY = """
+    SELECT "option_number", "outcome_description"
+    FROM events
+    WHERE "character_name" IN (?, 'Common')
+      AND "event_title" = ?
+    ORDER BY "option_number"
+"""
+
+TITLES_QUERY = 'SELECT DISTINCT "character_name", "event_title" FROM events'
+
+CHARACTER_EVENTS_QUERY = """
+    SELECT "event_title", "option_number", "outcome_description"
+    FROM events
+    WHERE "character_name" IN (?, 'Common')
+    ORDER BY "event_title", "option_number"
+"""
+
+
+def create_schema(cur):
+    """
+    Creates the events and pages tables and the unique lookup index if they
+    don't exist yet, upgrading databases built by older versions of make_db.py.
+
+    Args:
+        cur (sqlite3.Cursor): A cursor on a writable connection.
+    """
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS events (
+            "character_name" TEXT NOT NULL,
+            "event_title" TEXT NOT NULL,
+            "option_number" INTEGER NOT NULL,
+            "outcome_description" TEXT NOT NULL
+        )
+    ''')
+    # Content hash of the page each character's events were last parsed from
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS pages (
+            "character_name" TEXT PRIMARY KEY,
+            "content_hash" TEXT NOT NULL,
+            "updated_at" REAL NOT NULL
+        )
+    ''')
+
+    has_key = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_events_key'").fetchone()
+    if not has_key:
+        # Older databases had a non-unique index and could hold duplicate rows
+        cur.execute('DROP INDEX IF EXISTS idx_events_lookup')
+        cur.execute('''
+            DELETE FROM events WHERE rowid NOT IN (
+                SELECT MIN(rowid) FROM events
+                GROUP BY "character_name", "event_title", "option_number"
+            )
+        ''')
+        cur.execute('''
+            CREATE UNIQUE INDEX idx_events_key
+            ON events ("character_name", "event_title", "option_number")
+        ''')
+
+
+class EventStore:
+    """Keeps a single read-only connection to the event database open for lookups."""
+
+    def __init__(self, db_path=DB_PATH, mmap_size=MMAP_SIZE):
+        self.db_path = db_path
+        self.mmap_size = mmap_size
+        self.con = None
+        # The connection is shared between the OCR thread and anything else that
+        # looks events up, so access to it is serialized.
+        self.lock = threading.Lock()
+
+    def connect(self):
+        """Opens the database in read-only URI mode with memory-mapped I/O enabled."""
+        uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+        con = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=16)
+        con.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        con.execute("PRAGMA query_only = 1")
+
+        indexes = {row[1] for row in con.execute("PRAGMA index_list(events)")}
+        if "idx_events_key" not in indexes:
+            print("Warning: events table has no lookup index. Rebuild it with make_db.py for faster lookups.")
+
+        self.con = con
+        return con
+
+    def close(self):
+        """Closes the connection if it is open."""
+        with self.lock:
+            if self.con:
+                self.con.close()
+                self.con = None
+
+    def get_event_outcomes(self, event_title, character_name):
+        """
+        Looks up the outcomes of an event for a character, including "Common" events.
+
+        Args:
+            event_title (str): The cleaned title of the event to look up.
+            character_name (str): The name of the character currently being trained.
+
+        Returns:
+            A list of tuples containing the option number and outcome description,
+            or None if an error occurs.
+        """
+        with self.lock:
+            try:
+                con = self.con or self.connect()
+                # The SQL text never changes, so sqlite3 reuses the prepared
+                # statement from its cache on every call.
+                return con.execute(EVENT_QUERY, (character_name, event_title)).fetchall()
+            except sqlite3.Error as e:
+                print(f"Database error: {e}")
+                return None
+
+    def get_character_events(self, character_name):
+        """
+        Reads every event of a character and every "Common" event in one query.
+
+        Returns:
+            A dict mapping event title to the same list of (option number,
+            outcome description) tuples get_event_outcomes returns, or None if an
+            error occurs.
+        """
+        with self.lock:
+            try:
+                con = self.con or self.connect()
+                events = {}
+                for event_title, option_number, outcome in con.execute(CHARACTER_EVENTS_QUERY, (character_name,)):
+                    events.setdefault(event_title, []).append((option_number, outcome))
+                return events
+            except sqlite3.Error as e:
+                print(f"Database error: {e}")
+                return None
+
+    def get_event_titles(self):
+        """
+        Reads every distinct event title in the database, grouped by character.
+
+        Returns:
+            A dict mapping character name (including "Common") to a list of
+            event titles, or None if an error occurs.
+        """
+        with self.lock:
+            try:
+                con = self.con or self.connect()
+                titles = {}
+                for character_name, event_title in con.execute(TITLES_QUERY):
+                    titles.setdefault(character_name, []).append(event_title)
+                return titles
+            except sqlite3.Error as e:
+                print(f"Database error: {e}")
+                return None
+
+
+# Shared store behind get_event_outcomes and get_event_titles: an EventStore,
+# or an EventBundle once configure_event_store finds a current bundle
+_default_store = EventStore()
+_db_path = DB_PATH
+
+
+def use_event_store(store):
+    """Makes `store` the one the module-level lookup functions go through."""
+    global _default_store
+    _default_store.close()
+    _default_store = store
+
+
+def set_database_path(db_path):
+    """Points the shared store at a different database file (e.g. for benchmarks)."""
+    global _db_path
+    _db_path = db_path
+    use_event_store(EventStore(db_path))
+
+
+def configure_event_store(settings):
+    """
+    Picks the store described by settings.json: the precompiled bundle named by
+    "event_bundle" if it exists and matches the database, otherwise SQLite.
+
+    Returns:
+        The store now in use.
+    """
+    from event_bundle import BUNDLE_PATH, BundleError, EventBundle
+
+    bundle_path = settings.get('event_bundle', BUNDLE_PATH)
+    if bundle_path and os.path.exists(bundle_path):
+        try:
+            use_event_store(EventBundle(bundle_path, db_path=_db_path))
+            print(f"Looking up events in {bundle_path}.")
+            return _default_store
+        except BundleError as e:
+            print(f"Not using the event bundle: {e}")
+    if not isinstance(_default_store, EventStore):
+        use_event_store(EventStore(_db_path))
+    return _default_store
 
 
 def get_event_outcomes(event_title, character_name):
     """
-    Queries the umamusume_events.db for a given event title, checking for both
-    character-specific and "Common" events.
+    Looks up a given event title in the configured store (umamusume_events.db or
+    its bundle), checking for both character-specific and "Common" events.
 
     Args:
         event_title (str): The cleaned title of the event to look up.
@@ -14,32 +222,63 @@ def get_event_outcomes(event_title, character_name):
         A list of tuples containing the option number and outcome description,
         or None if the event is not found or an error occurs.
     """
-    results = None
-    con = None
-    try:
-        # Connect to the database file in the same directory
-        con = sqlite3.connect("umamusume_events.db")
-        cur = con.cursor()
+    # Return the results, which will be a list of rows or an empty list if not found.
+    # The calling function can check if the result is empty.
+    return _default_store.get_event_outcomes(event_title, character_name)
+
+
+def get_event_titles():
+    """Returns every event title in the configured store, grouped by character name."""
+    return _default_store.get_event_titles()
+
+
+def normalize_title(title):
+    """Hot set key for an event title: case-folded, with runs of whitespace collapsed."""
+    return ' '.join(title.split()).casefold()
+
+
+class HotSet:
+    """
+    Every event of one character plus the "Common" events, held in a dict for
+    the length of a run so lookups need no I/O.
+    """
+
+    def __init__(self, character_name, events):
+        self.character_name = character_name
+        self.outcomes = {normalize_title(title): outcomes for title, outcomes in events.items()}
+        self.load_ms = 0.0
 
-        # This query looks for an event matching the specific character OR a "Common" event
-        query = """
-            SELECT "option_number", "outcome_description" 
-            FROM events 
-            WHERE ("character_name" = ? OR "character_name" = 'Common') 
-              AND "event_title" = ?
-            ORDER BY "option_number"
+    @classmethod
+    def load(cls, character_name):
         """
+        Reads the character's events from the configured store.
 
-        cur.execute(query, (character_name, event_title))
-        results = cur.fetchall()
+        Returns:
+            A HotSet, or None if the store could not be read.
+        """
+        start = time.perf_counter()
+        events = _default_store.get_character_events(character_name)
+        if events is None:
+            return None
+        hot_set = cls(character_name, events)
+        hot_set.load_ms = (time.perf_counter() - start) * 1000
+        return hot_set
 
-    except sqlite3.Error as e:
-        print(f"Database error: {e}")
-        # In case of an error, results will remain None, which is the intended failure state
-    finally:
-        if con:
-            con.close()
+    def get(self, event_title):
+        """Same contract as get_event_outcomes, but an unknown title is simply an empty list."""
+        return self.outcomes.get(normalize_title(event_title), [])
 
-    # Return the results, which will be a list of rows or an empty list if not found.
-    # The calling function can check if the result is empty.
-    return results
\ No newline at end of file
+    def __contains__(self, event_title):
+        return normalize_title(event_title) in self.outcomes
+
+    def __len__(self):
+        return len(self.outcomes)
+
+    def memory_bytes(self):
+        """Approximate memory held by the dict, its keys and every outcome."""
+        total = sys.getsizeof(self.outcomes)
+        for key, outcomes in self.outcomes.items():
+            total += sys.getsizeof(key) + sys.getsizeof(outcomes)
+            for option in outcomes:
+                total += sys.getsizeof(option) + sum(sys.getsizeof(value) for value in option)
+        return total
@@ -0,0 +1,127 @@
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import deque
+
+DEBUG_DIR = "debug_captures"
+DEFAULT_BUFFER_SIZE = 30
+
+# Minimum time (in seconds) between two automatic flushes (e.g. on lookup misses)
+AUTO_FLUSH_COOLDOWN = 10
+
+# Whether lookup misses save the buffer by themselves; off by default, F9 always works
+DEFAULT_AUTO_FLUSH = False
+
+# Saved captures kept in DEBUG_DIR; the oldest are deleted past this many
+DEFAULT_MAX_DUMPS = 20
+
+
+class DebugRecorder:
+    """
+    Keeps the last few OCR'd frames in memory and writes them to disk on request.
+
+    Recording only appends to a ring buffer, so the OCR thread never touches the
+    disk. Drawing the text boxes and writing the images happens on a background
+    writer thread when a flush is requested.
+    """
+
+    def __init__(self, size=DEFAULT_BUFFER_SIZE, output_dir=DEBUG_DIR, auto_flush=DEFAULT_AUTO_FLUSH,
+                 max_dumps=DEFAULT_MAX_DUMPS):
+        self.output_dir = output_dir
+        self.auto_flush = auto_flush
+        self.max_dumps = max_dumps
+        self.frames = deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.requests = queue.Queue()
+        self.last_auto_flush = 0.0
+
+        self.writer_thread = threading.Thread(target=self.writer_loop, name="umabuddy-debug-writer")
+        self.writer_thread.daemon = True
+        self.writer_thread.start()
+
+    def record(self, region, img_rgb, results, cleaned_text):
+        """
+        Adds an OCR'd frame to the ring buffer.
+
+        Args:
+            region (str): Name of the region the image was captured from.
+            img_rgb (np.ndarray): The RGB image that was passed to OCR. It is kept
+                as-is, so callers must not modify it afterwards.
+            results (list): Raw EasyOCR results for the image.
+            cleaned_text (str): The text after clean_text.
+        """
+        with self.lock:
+            self.frames.append((time.time(), region, img_rgb, results, cleaned_text))
+
+    def request_flush(self, reason, automatic=False):
+        """
+        Asks the writer thread to save the buffered frames. Returns immediately.
+
+        Automatic flushes only happen when enabled, and are rate-limited so a run
+        of misses doesn't flood the disk.
+        """
+        now = time.time()
+        if automatic:
+            if not self.auto_flush or now - self.last_auto_flush < AUTO_FLUSH_COOLDOWN:
+                return
+            self.last_auto_flush = now
+
+        with self.lock:
+            snapshot = list(self.frames)
+        if snapshot:
+            self.requests.put((now, reason, snapshot))
+
+    def writer_loop(self):
+        while True:
+            requested_at, reason, snapshot = self.requests.get()
+            try:
+                self.write(requested_at, reason, snapshot)
+                self.prune()
+            except Exception as e:
+                print(f"Could not write debug captures: {e}")
+
+    def prune(self):
+        """Deletes the oldest saved captures beyond max_dumps."""
+        if self.max_dumps <= 0:
+            return
+        # Folder names start with their timestamp, so name order is age order
+        dumps = sorted(name for name in os.listdir(self.output_dir)
+                       if os.path.isfile(os.path.join(self.output_dir, name, "results.json")))
+        for name in dumps[:-self.max_dumps]:
+            shutil.rmtree(os.path.join(self.output_dir, name), ignore_errors=True)
+
+    def write(self, requested_at, reason, snapshot):
+        """Draws the OCR boxes onto each buffered frame and saves them with their results."""
+        import cv2
+
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(requested_at))
+        folder = os.path.join(self.output_dir, f"{stamp}_{reason}")
+        os.makedirs(folder, exist_ok=True)
+
+        manifest = []
+        for i, (timestamp, region, img_rgb, results, cleaned_text) in enumerate(snapshot):
+            # Convert to BGR for saving with cv2 (this also leaves the buffered image untouched).
+            # Preprocessed frames from recognize mode are grayscale.
+            img_bgr = cv2.cvtColor(img_rgb, cv2.COLOR_GRAY2BGR if img_rgb.ndim == 2 else cv2.COLOR_RGB2BGR)
+            for (bbox, text, prob) in results:
+                (top_left, top_right, bottom_right, bottom_left) = bbox
+                top_left = tuple(map(int, top_left))
+                bottom_right = tuple(map(int, bottom_right))
+                cv2.rectangle(img_bgr, top_left, bottom_right, (0, 255, 0), 2)
+
+            filename = f"{i:03d}_{region}.png"
+            cv2.imwrite(os.path.join(folder, filename), img_bgr)
+            manifest.append({
+                "file": filename,
+                "timestamp": timestamp,
+                "region": region,
+                "cleaned_text": cleaned_text,
+                "results": [{"text": text, "confidence": float(prob)} for (_, text, prob) in results],
+            })
+
+        with open(os.path.join(folder, "results.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4)
+        print(f"Saved {len(snapshot)} debug captures to {folder}")
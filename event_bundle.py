@@ -0,0 +1,288 @@
+import bisect
+import hashlib
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+BUNDLE_PATH = "umamusume_events.bundle"
+
+BUNDLE_MAGIC = b"UMAEVBND"
+# Bump whenever the layout below changes; older bundles are then rejected
+BUNDLE_VERSION = 1
+
+# magic, version, reserved, CRC32 of everything after the header, SHA-256 of the
+# source database's contents, string count, key count, option count, string bytes
+HEADER = struct.Struct("<8sHHI32sIIII")
+
+# Fields of one key record: character string, title string, first option, option count
+KEY_FIELDS = 4
+# Fields of one option record: option number, outcome string
+OPTION_FIELDS = 2
+
+ROWS_QUERY = '''
+    SELECT "character_name", "event_title", "option_number", "outcome_description"
+    FROM events
+    ORDER BY "character_name", "event_title", "option_number"
+'''
+
+
+class BundleError(Exception):
+    """Raised when a bundle is missing, corrupt, from another version, or out of date."""
+
+
+def key_hash(character_name, event_title):
+    """Stable 64-bit hash of a (character, title) pair, used to sort and probe the key index."""
+    key = f"{character_name}\0{event_title}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def database_fingerprint(con):
+    """
+    SHA-256 identifying the contents of an event database.
+
+    Built from the page content hashes make_db.py records for every character and
+    the time each was last ingested, so it changes whenever an update touches the
+    events, including re-parsing an unchanged page (--force, another --parser).
+    Databases without page hashes (built by older versions of make_db.py) are
+    fingerprinted from every row.
+    """
+    digest = hashlib.sha256()
+    pages = []
+    if con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pages'").fetchone():
+        pages = con.execute('SELECT "character_name", "content_hash", "updated_at" FROM pages '
+                            'ORDER BY "character_name"').fetchall()
+    if pages:
+        for character_name, content_hash, updated_at in pages:
+            digest.update(f"{character_name}\0{content_hash}\0{updated_at!r}\0".encode("utf-8"))
+        digest.update(str(con.execute("SELECT COUNT(*) FROM events").fetchone()[0]).encode("ascii"))
+    else:
+        for row in con.execute(ROWS_QUERY):
+            digest.update("\0".join(map(str, row)).encode("utf-8") + b"\n")
+    return digest.digest()
+
+
+def read_fingerprint(db_path):
+    """
+    Fingerprint of the database at db_path, or None if there is no database there.
+
+    Raises:
+        BundleError: If the database exists but can't be fingerprinted.
+    """
+    if not os.path.exists(db_path):
+        return None
+    try:
+        con = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            return database_fingerprint(con)
+        finally:
+            con.close()
+    except sqlite3.Error as e:
+        raise BundleError(f"Could not fingerprint {db_path}: {e}")
+
+
+def write_bundle(db_path, bundle_path=BUNDLE_PATH):
+    """
+    Compiles the event database into a bundle file.
+
+    Layout, after the header: the sorted 64-bit key hashes, the key records,
+    the option records, the string offsets and the UTF-8 string data. Every
+    string (character names, titles and outcomes) is stored once.
+
+    Returns:
+        A tuple of (key count, option count, bundle size in bytes).
+    """
+    con = sqlite3.connect(db_path)
+    try:
+        fingerprint = database_fingerprint(con)
+        rows = con.execute(ROWS_QUERY).fetchall()
+    finally:
+        con.close()
+
+    strings = {}
+
+    def intern(text):
+        string_id = strings.get(text)
+        if string_id is None:
+            string_id = strings[text] = len(strings)
+        return string_id
+
+    # Rows come grouped by key and ordered by option number
+    keys = []
+    options = []
+    for character_name, event_title, option_number, outcome in rows:
+        if not keys or keys[-1][1] != character_name or keys[-1][2] != event_title:
+            keys.append([key_hash(character_name, event_title), character_name, event_title, len(options) // OPTION_FIELDS, 0])
+        keys[-1][4] += 1
+        options.extend((option_number, intern(outcome)))
+    keys.sort(key=lambda k: k[0])
+
+    records = []
+    for _, character_name, event_title, first, count in keys:
+        records.extend((intern(character_name), intern(event_title), first, count))
+
+    encoded = [text.encode("utf-8") for text in strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    body = b"".join((
+        struct.pack(f"<{len(keys)}Q", *(k[0] for k in keys)),
+        struct.pack(f"<{len(records)}I", *records),
+        struct.pack(f"<{len(options)}I", *options),
+        struct.pack(f"<{len(offsets)}I", *offsets),
+        b"".join(encoded),
+    ))
+    header = HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, 0, zlib.crc32(body), fingerprint,
+                         len(strings), len(keys), len(options) // OPTION_FIELDS, offsets[-1])
+
+    tmp_path = bundle_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(body)
+    os.replace(tmp_path, bundle_path)
+    return len(keys), len(options) // OPTION_FIELDS, len(header) + len(body)
+
+
+class EventBundle:
+    """
+    Read-only event store backed by a memory-mapped bundle file.
+
+    Lookups binary-search the sorted key hashes and read the matching option
+    records straight out of the mapping, with no SQL and nothing parsed up front.
+    Offers the same get_event_outcomes/get_event_titles/close as EventStore.
+    """
+
+    def __init__(self, bundle_path=BUNDLE_PATH, db_path=None):
+        """
+        Args:
+            bundle_path (str): The bundle written by make_db.py --bundle.
+            db_path (str): Database the bundle was built from. If it exists, the
+                bundle must match its current contents.
+
+        Raises:
+            BundleError: If the bundle can't be used.
+        """
+        if sys.byteorder != "little":
+            raise BundleError("Event bundles can only be read on little-endian machines.")
+        try:
+            with open(bundle_path, "rb") as f:
+                self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise BundleError(f"Could not open {bundle_path}: {e}")
+
+        try:
+            self.view = memoryview(self.mm)
+            self._check_header(bundle_path, db_path)
+        except BundleError:
+            self.close()
+            raise
+
+        # Character name -> string id, built the first time a character's events are read
+        self.character_ids = None
+
+        offset = HEADER.size
+        self.hashes = self.view[offset:offset + 8 * self.key_count].cast("Q")
+        offset += 8 * self.key_count
+        self.keys = self.view[offset:offset + 4 * KEY_FIELDS * self.key_count].cast("I")
+        offset += 4 * KEY_FIELDS * self.key_count
+        self.options = self.view[offset:offset + 4 * OPTION_FIELDS * self.option_count].cast("I")
+        offset += 4 * OPTION_FIELDS * self.option_count
+        self.offsets = self.view[offset:offset + 4 * (self.string_count + 1)].cast("I")
+        offset += 4 * (self.string_count + 1)
+        self.strings = self.view[offset:offset + self.string_bytes]
+
+    def _check_header(self, bundle_path, db_path):
+        if len(self.mm) < HEADER.size:
+            raise BundleError(f"{bundle_path} is truncated.")
+        (magic, version, _, crc, fingerprint, self.string_count, self.key_count,
+         self.option_count, self.string_bytes) = HEADER.unpack_from(self.mm)
+        if magic != BUNDLE_MAGIC:
+            raise BundleError(f"{bundle_path} is not an event bundle.")
+        if version != BUNDLE_VERSION:
+            raise BundleError(f"{bundle_path} is bundle version {version}, expected {BUNDLE_VERSION}.")
+
+        expected_size = (HEADER.size + 8 * self.key_count + 4 * KEY_FIELDS * self.key_count
+                         + 4 * OPTION_FIELDS * self.option_count + 4 * (self.string_count + 1)
+                         + self.string_bytes)
+        if len(self.mm) != expected_size or zlib.crc32(self.view[HEADER.size:]) != crc:
+            raise BundleError(f"{bundle_path} is corrupt.")
+
+        # A bundle that can't be checked against an existing database counts as out of date
+        if db_path:
+            current = read_fingerprint(db_path)
+            if current is not None and current != fingerprint:
+                raise BundleError(f"{bundle_path} is out of date with {db_path}. Rebuild it with make_db.py --bundle.")
+
+    def string(self, string_id):
+        return str(self.strings[self.offsets[string_id]:self.offsets[string_id + 1]], "utf-8")
+
+    def _options(self, character_name, event_title):
+        """Option records of one (character, title) key, as (option number, outcome id) pairs."""
+        target = key_hash(character_name, event_title)
+        i = bisect.bisect_left(self.hashes, target)
+        while i < self.key_count and self.hashes[i] == target:
+            base = i * KEY_FIELDS
+            if (self.string(self.keys[base]) == character_name
+                    and self.string(self.keys[base + 1]) == event_title):
+                first, count = self.keys[base + 2], self.keys[base + 3]
+                return [(self.options[j * OPTION_FIELDS], self.options[j * OPTION_FIELDS + 1])
+                        for j in range(first, first + count)]
+            i += 1
+        return []
+
+    def get_event_outcomes(self, event_title, character_name):
+        """Same contract as EventStore.get_event_outcomes."""
+        if self.mm is None:
+            return None
+        found = self._options(character_name, event_title)
+        if character_name != "Common":
+            found += self._options("Common", event_title)
+            found.sort(key=lambda option: option[0])
+        return [(option_number, self.string(outcome_id)) for option_number, outcome_id in found]
+
+    def get_character_events(self, character_name):
+        """Same contract as EventStore.get_character_events."""
+        if self.mm is None:
+            return None
+        column = np.frombuffer(self.keys, dtype=np.uint32)[::KEY_FIELDS]
+        if self.character_ids is None:
+            # Only the few distinct character strings get decoded, once
+            self.character_ids = {self.string(int(string_id)): int(string_id) for string_id in np.unique(column)}
+        wanted = [self.character_ids[name] for name in (character_name, "Common") if name in self.character_ids]
+
+        events = {}
+        for i in np.flatnonzero(np.isin(column, wanted)).tolist():
+            base = i * KEY_FIELDS
+            first, count = self.keys[base + 2], self.keys[base + 3]
+            events.setdefault(self.string(self.keys[base + 1]), []).extend(
+                (self.options[j * OPTION_FIELDS], self.string(self.options[j * OPTION_FIELDS + 1]))
+                for j in range(first, first + count))
+        for outcomes in events.values():
+            outcomes.sort(key=lambda option: option[0])
+        return events
+
+    def get_event_titles(self):
+        """Same contract as EventStore.get_event_titles."""
+        if self.mm is None:
+            return None
+        titles = {}
+        for i in range(self.key_count):
+            base = i * KEY_FIELDS
+            titles.setdefault(self.string(self.keys[base]), []).append(self.string(self.keys[base + 1]))
+        return titles
+
+    def close(self):
+        """Releases the mapping."""
+        for name in ("hashes", "keys", "options", "offsets", "strings", "view"):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        if getattr(self, "mm", None) is not None:
+            self.mm.close()
+            self.mm = None
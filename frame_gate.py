@@ -0,0 +1,80 @@
+import numpy as np
+
+# Default absolute difference (0-255 scale) of any one thumbnail cell between two
+# frames above which a region is considered changed. A title swapped on the same
+# banner only moves the cells under the text, by 10 or more even for one letter;
+# capture noise moves them by 1-3.
+DEFAULT_CHANGE_THRESHOLD = 6.0
+
+# Size (width, height) of the thumbnail used for the comparison.
+SIGNATURE_SIZE = (32, 12)
+
+
+class FrameGate:
+    """Skips OCR on screen regions that have not changed since they were last read."""
+
+    def __init__(self, threshold=DEFAULT_CHANGE_THRESHOLD, size=SIGNATURE_SIZE):
+        self.threshold = float(threshold)
+        self.size = size
+        self.last_signatures = {}
+        self.runs = 0
+        self.skips = 0
+
+    def signature(self, img_np):
+        """Returns a small grayscale thumbnail of the image using block averaging."""
+        if img_np.ndim == 3:
+            gray = img_np[:, :, :3].mean(axis=2, dtype=np.float32)
+        else:
+            gray = img_np.astype(np.float32)
+
+        target_w, target_h = self.size
+        h, w = gray.shape
+        block_h = max(1, h // target_h)
+        block_w = max(1, w // target_w)
+        rows = min(target_h, h // block_h)
+        cols = min(target_w, w // block_w)
+
+        cropped = gray[:rows * block_h, :cols * block_w]
+        return cropped.reshape(rows, block_h, cols, block_w).mean(axis=(1, 3))
+
+    def should_process(self, key, img_np):
+        """
+        Compares the image with the last frame that was processed for this key.
+
+        Args:
+            key (str): Name of the region the image was captured from.
+            img_np (np.ndarray): The captured region.
+
+        Returns:
+            True if the region changed (and OCR should run), False otherwise.
+        """
+        current = self.signature(img_np)
+        previous = self.last_signatures.get(key)
+
+        changed = (
+            previous is None
+            or previous.shape != current.shape
+            or float(np.abs(current - previous).max()) > self.threshold
+        )
+
+        if changed:
+            # Only remember frames that were actually read, so slow drift still
+            # adds up to a change eventually.
+            self.last_signatures[key] = current
+            self.runs += 1
+        else:
+            self.skips += 1
+        return changed
+
+    def reset(self, key=None):
+        """Forgets the stored frame for one region, or for all regions."""
+        if key is None:
+            self.last_signatures.clear()
+        else:
+            self.last_signatures.pop(key, None)
+
+    def report(self):
+        """Returns a short summary of how many frames were read and skipped."""
+        total = self.runs + self.skips
+        skipped_pct = (100.0 * self.skips / total) if total else 0.0
+        return f"OCR runs: {self.runs}, skipped unchanged frames: {self.skips} ({skipped_pct:.1f}%)"
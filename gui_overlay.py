@@ -1,9 +1,31 @@
+import threading
+
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
+
+OUTCOME_STYLE = """
+    background-color: rgba(0, 0, 0, 180);
+    color: white;
+    font-size: 16px;
+    font-weight: bold;
+    padding: 8px;
+    border-radius: 5px;
+"""
 
 
 class OverlayWindow(QWidget):
-    """A transparent, always-on-top window to display OCR results."""
+    """
+    A transparent, always-on-top window to display OCR results.
+
+    update_outcomes, clear_outcomes and update_stats may be called from any
+    thread. They only record what should be shown and post one queued signal;
+    the GUI thread then applies the newest state in a single pass, so a burst
+    of updates costs one repaint, and an update that matches what is already
+    on screen costs none.
+    """
+
+    # Queued to the GUI thread when there is new state to show
+    renderRequested = pyqtSignal()
 
     def __init__(self):
         super().__init__()
@@ -18,43 +40,101 @@ class OverlayWindow(QWidget):
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
 
-        # We'll use up to 3 labels to display outcomes
+        # Outcome labels are created as needed and reused; extra ones are just hidden
         self.outcome_labels = []
-        for _ in range(3):
+
+        # Optional performance readout, only shown when metrics.overlay_stats is on
+        self.stats_label = QLabel("")
+        self.stats_label.setStyleSheet("""
+            background-color: rgba(0, 0, 0, 120);
+            color: #9f9;
+            font-size: 10px;
+            font-family: monospace;
+            padding: 4px;
+            border-radius: 3px;
+        """)
+        self.stats_label.hide()
+        self.layout.addWidget(self.stats_label)
+
+        # What is on screen, and the newest state requested from any thread
+        self.shown_outcomes = ()
+        self.shown_centered = False
+        self.shown_stats = ""
+        self.pending_lock = threading.Lock()
+        self.pending_outcomes = ()
+        self.pending_centered = False
+        self.pending_stats = ""
+        self.render_posted = False
+
+        self.renderRequested.connect(self.apply_pending, Qt.ConnectionType.QueuedConnection)
+
+    def request_render(self, outcomes=None, centered=False, stats=None):
+        """Records the state to show and posts a render unless one is already on its way."""
+        with self.pending_lock:
+            if outcomes is not None:
+                self.pending_outcomes = tuple(outcomes)
+                self.pending_centered = centered
+            if stats is not None:
+                self.pending_stats = stats
+            if self.render_posted:
+                return
+            self.render_posted = True
+        self.renderRequested.emit()
+
+    def apply_pending(self):
+        """GUI thread: brings the labels in line with the newest requested state."""
+        with self.pending_lock:
+            outcomes, centered, stats = self.pending_outcomes, self.pending_centered, self.pending_stats
+            self.render_posted = False
+
+        if outcomes != self.shown_outcomes or centered != self.shown_centered:
+            if centered != self.shown_centered:
+                for label in self.outcome_labels:
+                    label.setAlignment(self.label_alignment(centered))
+            for i, text in enumerate(outcomes):
+                label = self.outcome_label(i, centered)
+                if i >= len(self.shown_outcomes) or text != self.shown_outcomes[i]:
+                    label.setText(text)
+                label.show()
+            for label in self.outcome_labels[len(outcomes):len(self.shown_outcomes)]:
+                label.hide()
+            self.shown_outcomes, self.shown_centered = outcomes, centered
+
+        if stats != self.shown_stats:
+            self.stats_label.setText(stats)
+            self.stats_label.setVisible(bool(stats))
+            self.shown_stats = stats
+
+    @staticmethod
+    def label_alignment(centered):
+        if centered:
+            return Qt.AlignmentFlag.AlignCenter
+        return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+
+    def outcome_label(self, index, centered=False):
+        """Returns the index-th outcome label, creating labels the first time they are needed."""
+        while len(self.outcome_labels) <= index:
             label = QLabel("")
-            label.setStyleSheet("""
-                background-color: rgba(0, 0, 0, 180);
-                color: white;
-                font-size: 16px;
-                font-weight: bold;
-                padding: 8px;
-                border-radius: 5px;
-            """)
+            label.setStyleSheet(OUTCOME_STYLE)
+            label.setAlignment(self.label_alignment(centered))
             label.hide()  # Initially hidden
-            self.layout.addWidget(label)
+            # Outcomes go above the stats readout
+            self.layout.insertWidget(len(self.outcome_labels), label)
             self.outcome_labels.append(label)
+        return self.outcome_labels[index]
 
     def update_outcomes(self, outcomes):
         """Displays a list of outcome strings on the overlay."""
-        for i, label in enumerate(self.outcome_labels):
-            if i < len(outcomes):
-                label.setText(outcomes[i])
-                label.show()
-            else:
-                label.hide()
+        self.request_render(outcomes)
+
+    def update_stats(self, text):
+        """Shows the performance readout below the outcomes."""
+        self.request_render(stats=text)
 
     def clear_outcomes(self):
         """Hides all outcome labels."""
-        for label in self.outcome_labels:
-            label.hide()
+        self.request_render(())
 
     def show_status_message(self, message):
         """Displays a single, central status message."""
-        # Hide all regular labels first
-        self.clear_outcomes()
-        # Use the first label to show the status
-        status_label = self.outcome_labels[0]
-        status_label.setText(message)
-        status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)  # Center the text
-        status_label.show()
-
+        self.request_render((message,), centered=True)
@@ -6,7 +6,6 @@ from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLabel,
 from PyQt6.QtCore import Qt, QRect, QPoint, pyqtSignal
 from PyQt6.QtGui import QPainter, QPen, QColor, QScreen
 
-from ocr_logic import run_ocr_engine
 from gui_overlay import OverlayWindow
 
 
@@ -160,6 +159,9 @@ class SettingsWindow(QWidget):
         self.overlay_window.show_status_message("Initializing EasyOCR...\n(This may take a moment)")
         self.overlay_window.show()
 
+        # Imported here so the settings window doesn't wait on the OCR libraries
+        from ocr_logic import run_ocr_engine
+
         # Start the OCR engine in a separate thread
         self.ocr_thread = threading.Thread(target=run_ocr_engine, args=(self.overlay_window,))
         self.ocr_thread.daemon = True
@@ -1,24 +1,50 @@
+import argparse
+import hashlib
+import json
+import os
 import sqlite3
 import re
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import WebDriverException, TimeoutException
-
-
-def scrape_event_data():
-    # --- CONFIGURATION ---
-    # ONLY UTILIZE GAMETORA LINKS. ANY OTHER WIKI/DBs MAY NOT WORK PROPERLY
-    # MAKE SURE THE LINK HAS AN ID ASSOCIATED WITH THE HORSE NAME
-    URL = "https://gametora.com/umamusume/characters/100101-special-week"
-    CHARACTER_NAME = "Special Week"
+
+from database import DB_PATH, create_schema
+from event_bundle import BUNDLE_PATH, write_bundle
+
+# --- CONFIGURATION ---
+# ONLY UTILIZE GAMETORA LINKS. ANY OTHER WIKI/DBs MAY NOT WORK PROPERLY
+# MAKE SURE THE LINK HAS AN ID ASSOCIATED WITH THE HORSE NAME
+URL = "https://gametora.com/umamusume/characters/100101-special-week"
+CHARACTER_NAME = "Special Week"
+
+# Tags whose contents BeautifulSoup's get_text leaves out
+NON_TEXT_TAGS = {'script', 'style', 'template'}
+NON_ALPHANUMERIC = re.compile(r'[^a-zA-Z0-9\s]')
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "bs4"
+
+UPSERT_QUERY = """
+    INSERT INTO events VALUES (?, ?, ?, ?)
+    ON CONFLICT ("character_name", "event_title", "option_number")
+    DO UPDATE SET "outcome_description" = excluded."outcome_description"
+"""
+
+
+def fetch_page_source(url, character_name):
+    """Opens a GameTora character page in Chrome, clicks every event, and returns the HTML."""
+    # Selenium is only needed for live scraping, not for parsing saved pages
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service as ChromeService
+    from webdriver_manager.chrome import ChromeDriverManager
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
 
     # --- SELENIUM SETUP ---
     chrome_options = Options()
@@ -30,7 +56,7 @@ def scrape_event_data():
     chrome_options.add_argument(
         "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36")
 
-    print(f"Scraping data for {CHARACTER_NAME} from {URL} using Selenium...")
+    print(f"Scraping data for {character_name} from {url} using Selenium...")
 
     driver = None
     try:
@@ -40,7 +66,7 @@ def scrape_event_data():
 
         driver = webdriver.Chrome(service=service, options=chrome_options)
 
-        driver.get(URL)
+        driver.get(url)
 
         print("Waiting for the basic page structure (body) to load...")
         WebDriverWait(driver, 15).until(
@@ -67,17 +93,42 @@ def scrape_event_data():
 
     # except TimeoutException:
     #     print("\n--- A SELENIUM TIMEOUT ERROR OCCURRED ---")
-    #     return []
+    #     return None
     # except WebDriverException as e:
     #     print(f"\n--- A SELENIUM WEBDRIVER ERROR OCCURRED ---\n{e}")
-    #     return []
+    #     return None
     except Exception as e:
         print(f"An unexpected error occurred during Selenium operation: {e}")
-        return []
+        return None
     finally:
         if driver:
             driver.quit()
 
+    return page_source
+
+
+def parse_event_page(page_source, character_name, verbose=True, parser=None):
+    """
+    Extracts every event outcome from a GameTora character page.
+
+    Args:
+        page_source (str): HTML of the page after all event tooltips were opened.
+        character_name (str): Name to store the events under.
+        verbose (bool): Prints progress while parsing.
+        parser (str): "lxml" or "bs4". Defaults to lxml when it is installed.
+
+    Returns:
+        A list of (character_name, event_title, option_number, outcome) tuples.
+    """
+    if parser is None:
+        parser = DEFAULT_PARSER
+    if parser == "lxml":
+        return parse_event_page_lxml(page_source, character_name, verbose)
+    return parse_event_page_bs4(page_source, character_name, verbose)
+
+
+def parse_event_page_bs4(page_source, character_name, verbose=True):
+    """The original BeautifulSoup parser. Kept as a fallback and as the reference output."""
     soup = BeautifulSoup(page_source, "html.parser")
     scraped_data = []
 
@@ -100,7 +151,8 @@ def scrape_event_data():
         if cleaned_title:
             tooltips_map[cleaned_title] = tooltip
 
-    print(f"Found and mapped {len(tooltips_map)} hidden tooltip data blocks.")
+    if verbose:
+        print(f"Found and mapped {len(tooltips_map)} hidden tooltip data blocks.")
     # if not tooltips_map:
     #     print("CRITICAL FAILURE: Could not find any tooltips to build the data map.")
     #     return []
@@ -110,7 +162,8 @@ def scrape_event_data():
     #     print("Could not find any event trigger items. The class name 'compatibility_viewer_item__' may have changed.")
     #     return []
 
-    print(f"Found {len(event_triggers)} potential event triggers to process.")
+    if verbose:
+        print(f"Found {len(event_triggers)} potential event triggers to process.")
 
     for trigger in event_triggers:
         trigger_title = trigger.get_text(strip=True)
@@ -136,41 +189,339 @@ def scrape_event_data():
                 option_number = i + 1
 
                 scraped_data.append(
-                    (CHARACTER_NAME, cleaned_trigger_title, option_number, full_outcome)
+                    (character_name, cleaned_trigger_title, option_number, full_outcome)
                 )
         else:
             pass
 
-    print(f"\nSuccessfully scraped {len(scraped_data)} event outcomes.")
+    if verbose:
+        print(f"\nSuccessfully scraped {len(scraped_data)} event outcomes.")
     return scraped_data
 
-# --- DATABASE CREATION ---
 
-event_data = scrape_event_data()
+def _stripped_text(element, skip=None):
+    """
+    Same as BeautifulSoup's get_text(strip=True): every text node under the
+    element, stripped, with empty ones dropped and the rest joined together.
+    Comments and script/style contents are left out, as is the `skip` subtree.
+    """
+    parts = []
+
+    def walk(node):
+        if isinstance(node.tag, str) and node.tag not in NON_TEXT_TAGS and node.text:
+            stripped = node.text.strip()
+            if stripped:
+                parts.append(stripped)
+        for child in node:
+            if child is not skip:
+                walk(child)
+            if child.tail:
+                stripped = child.tail.strip()
+                if stripped:
+                    parts.append(stripped)
+
+    walk(element)
+    return ''.join(parts)
+
+
+def parse_event_page_lxml(page_source, character_name, verbose=True):
+    """
+    Fast parser producing the same rows as parse_event_page_bs4.
+
+    lxml builds the tree in C in one pass, and titles and option tables are then
+    read in a single walk over it. No subtree is serialized and parsed again,
+    and each tooltip's table is read once however many triggers point at it.
+    """
+    from lxml import html as lxml_html
+
+    root = lxml_html.document_fromstring(page_source.encode('utf-8'),
+                                         parser=lxml_html.HTMLParser(encoding='utf-8'))
+
+    tooltips_map = {}
+    event_triggers = []
+    for div in root.iter('div'):
+        classes = div.get('class') or ''
+        # Same matching as the CSS selectors 'div.tippy-box' and 'div[class*="compatibility_viewer_item__"]'
+        if 'compatibility_viewer_item__' in classes:
+            event_triggers.append(div)
+        if 'tippy-box' not in classes.split():
+            continue
+
+        content_area = next((d for d in div.iterdescendants('div')
+                             if 'tippy-content' in (d.get('class') or '').split()), None)
+        if content_area is None:
+            continue
+
+        table = next(content_area.iterdescendants('table'), None)
+        cleaned_title = NON_ALPHANUMERIC.sub('', _stripped_text(content_area, skip=table)).strip()
+        if cleaned_title:
+            tooltips_map[cleaned_title] = div
+
+    if verbose:
+        print(f"Found and mapped {len(tooltips_map)} hidden tooltip data blocks.")
+        print(f"Found {len(event_triggers)} potential event triggers to process.")
+
+    scraped_data = []
+    options_by_tooltip = {}
+    for trigger in event_triggers:
+        cleaned_trigger_title = NON_ALPHANUMERIC.sub('', _stripped_text(trigger)).strip()
+
+        matched_tooltip = tooltips_map.get(cleaned_trigger_title)
+        if matched_tooltip is None:
+            continue
+
+        options = options_by_tooltip.get(matched_tooltip)
+        if options is None:
+            options = []
+            table = next(matched_tooltip.iterdescendants('table'), None)
+            if table is not None:
+                for i, row in enumerate(table.iterdescendants('tr')):
+                    cells = list(row.iterdescendants('td'))
+                    if len(cells) < 2:
+                        continue
+                    choice_text = _stripped_text(cells[0])
+                    outcome_text = _stripped_text(cells[1]).replace('\n', ' ')
+                    options.append((i + 1, f"{choice_text} -> {outcome_text}"))
+            options_by_tooltip[matched_tooltip] = options
+
+        for option_number, full_outcome in options:
+            scraped_data.append((character_name, cleaned_trigger_title, option_number, full_outcome))
+
+    if verbose:
+        print(f"\nSuccessfully scraped {len(scraped_data)} event outcomes.")
+    return scraped_data
+
 
-if event_data:
+def page_hash(page_source):
+    """Returns a SHA-256 hex digest of a page's HTML."""
+    return hashlib.sha256(page_source.encode('utf-8')).hexdigest()
+
+
+def parse_page_file(path, character_name, parser=None):
+    """
+    Process-pool worker: parses one saved page.
+
+    Returns:
+        A tuple of (path, rows, page size in bytes, parse time in seconds).
+    """
+    start = time.perf_counter()
+    with open(path, 'r', encoding='utf-8') as f:
+        page_source = f.read()
+    rows = parse_event_page(page_source, character_name, verbose=False, parser=parser)
+    return path, rows, len(page_source.encode('utf-8')), time.perf_counter() - start
+
+
+def load_manifest(manifest_path):
+    """
+    Reads a batch manifest: a JSON object mapping saved page file names (relative
+    to the pages directory) to character names, e.g. {"special_week.html": "Special Week"}.
+
+    Raises:
+        OSError: If the manifest can't be read.
+        ValueError: If it isn't JSON of that shape.
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        try:
+            manifest = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Manifest {manifest_path} is not valid JSON: {e}")
+    if not isinstance(manifest, dict) or not all(isinstance(v, str) for v in manifest.values()):
+        raise ValueError(f"Manifest {manifest_path} must map page file names to character names.")
+    return manifest
+
+
+def connect_for_update():
+    """
+    Opens the database for writing in WAL mode, so a running UmaBuddy keeps
+    reading the previous data while an update is in progress.
+    """
+    con = sqlite3.connect(DB_PATH)
+    con.execute("PRAGMA journal_mode = WAL")
+    create_schema(con.cursor())
+    con.commit()
+    return con
+
+
+def get_stored_hashes(con):
+    """Returns a dict of character name -> content hash of the page last ingested for it."""
+    return dict(con.execute('SELECT "character_name", "content_hash" FROM pages'))
+
+
+def upsert_character(cur, character_name, rows, content_hash):
+    """
+    Brings one character's events in line with freshly parsed rows, touching
+    only the rows that were added, changed or removed.
+
+    Returns:
+        A tuple of (added, updated, removed) row counts.
+    """
+    existing = {
+        (title, option): outcome
+        for title, option, outcome in cur.execute(
+            'SELECT "event_title", "option_number", "outcome_description" FROM events WHERE "character_name" = ?',
+            (character_name,))
+    }
+
+    # The same event can be listed more than once on a page; the first one wins
+    parsed = {}
+    for _, title, option, outcome in rows:
+        parsed.setdefault((title, option), outcome)
+
+    changed = [(character_name, title, option, outcome)
+               for (title, option), outcome in parsed.items()
+               if existing.get((title, option)) != outcome]
+    removed = [(character_name, title, option) for (title, option) in existing.keys() - parsed.keys()]
+
+    cur.executemany(UPSERT_QUERY, changed)
+    cur.executemany(
+        'DELETE FROM events WHERE "character_name" = ? AND "event_title" = ? AND "option_number" = ?', removed)
+    cur.execute(
+        'INSERT OR REPLACE INTO pages ("character_name", "content_hash", "updated_at") VALUES (?, ?, ?)',
+        (character_name, content_hash, time.time()))
+
+    added = sum(1 for _, title, option, _ in changed if (title, option) not in existing)
+    return added, len(changed) - added, len(removed)
+
+
+def ingest_saved_pages(pages_dir, manifest_path, workers=None, force=False, parser=None):
+    """
+    Parses the saved character pages that changed since the last run in a
+    process pool, then upserts their events in a single transaction.
+
+    Args:
+        pages_dir (str): Directory of saved pages.
+        manifest_path (str): Manifest mapping page file names to character names.
+        workers (int): Parser processes (default: CPU count).
+        force (bool): Re-parse every page even if its content hash is unchanged.
+        parser (str): "lxml" or "bs4" (see parse_event_page).
+    """
     con = None
     try:
-        con = sqlite3.connect("umamusume_events.db")
+        manifest = load_manifest(manifest_path)
+        con = connect_for_update()
+        stored_hashes = {} if force else get_stored_hashes(con)
+
+        # Hashing is much cheaper than parsing, so unchanged pages are skipped up front
+        jobs = {}
+        for file_name, character_name in manifest.items():
+            path = os.path.join(pages_dir, file_name)
+            with open(path, 'rb') as f:
+                content_hash = hashlib.sha256(f.read()).hexdigest()
+            if stored_hashes.get(character_name) == content_hash:
+                continue
+            jobs[path] = (character_name, content_hash)
+
+        print(f"{len(manifest) - len(jobs)} of {len(manifest)} pages are unchanged.")
+        if not jobs:
+            print("Database is already up to date.")
+            return
+        print(f"Parsing {len(jobs)} changed pages with {workers or os.cpu_count()} worker processes...")
+
+        parsed = []
+        parse_start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(parse_page_file, path, character_name, parser)
+                       for path, (character_name, _) in jobs.items()]
+            for future in as_completed(futures):
+                try:
+                    path, rows, size, seconds = future.result()
+                except Exception as e:
+                    print(f"Failed to parse a page: {e}")
+                    continue
+                character_name, content_hash = jobs[path]
+                if not rows:
+                    print(f"Skipping {os.path.basename(path)} ({character_name}): no events found.")
+                    continue
+                parsed.append((character_name, content_hash, rows))
+                print(f"Parsed {os.path.basename(path)} ({character_name}): {len(rows)} outcomes, "
+                      f"{size / 1024:.0f} KB in {seconds * 1000:.0f} ms ({size / 1024 / max(seconds, 1e-9):.0f} KB/s)")
+        print(f"Parsed {len(parsed)} pages in {time.perf_counter() - parse_start:.2f}s.")
+
+        insert_start = time.perf_counter()
+        # One transaction for the whole batch: readers see either the old data or the new data
         cur = con.cursor()
+        cur.execute("BEGIN")
+        for character_name, content_hash, rows in sorted(parsed):
+            start = time.perf_counter()
+            added, updated, removed = upsert_character(cur, character_name, rows, content_hash)
+            seconds = time.perf_counter() - start
+            print(f"{character_name}: {added} added, {updated} updated, {removed} removed in "
+                  f"{seconds * 1000:.1f} ms ({len(rows) / max(seconds, 1e-9):.0f} rows/s)")
+        con.commit()
+        print(f"Updated {len(parsed)} characters in {time.perf_counter() - insert_start:.2f}s.")
+    except (sqlite3.Error, OSError, ValueError) as e:
+        print(f"An error occurred: {e}")
+        if con:
+            con.rollback()
+    finally:
+        if con:
+            con.close()
+            print("Database connection closed.")
+
+
+# --- DATABASE CREATION ---
+
+def build_single_character_db(force=False, parser=None):
+    """Scrapes the configured character and updates its events in the database."""
+    page_source = fetch_page_source(URL, CHARACTER_NAME)
+    if page_source is None:
+        print("No data was scraped, database was not changed.")
+        return
+
+    content_hash = page_hash(page_source)
+    con = None
+    try:
+        con = connect_for_update()
         print("Successfully connected to database.")
-        cur.execute("DROP TABLE IF EXISTS events")
-        cur.execute('''
-            CREATE TABLE events (
-                "character_name" TEXT NOT NULL,
-                "event_title" TEXT NOT NULL,
-                "option_number" INTEGER NOT NULL,
-                "outcome_description" TEXT NOT NULL
-            )
-        ''')
-        cur.executemany("INSERT INTO events VALUES (?, ?, ?, ?)", event_data)
+        if not force and get_stored_hashes(con).get(CHARACTER_NAME) == content_hash:
+            print(f"Page for {CHARACTER_NAME} is unchanged, nothing to update.")
+            return
+
+        event_data = parse_event_page(page_source, CHARACTER_NAME, parser=parser)
+        if not event_data:
+            print("No data was scraped, database was not changed.")
+            return
+
+        added, updated, removed = upsert_character(con.cursor(), CHARACTER_NAME, event_data, content_hash)
         con.commit()
-        print(f"Inserted {len(event_data)} records into the database.")
+        print(f"{CHARACTER_NAME}: {added} records added, {updated} updated, {removed} removed.")
     except sqlite3.Error as e:
         print(f"An error occurred: {e}")
     finally:
         if con:
             con.close()
             print("Database connection closed.")
-else:
-    print("No data was scraped, database was not created.")
\ No newline at end of file
+
+
+def build_bundle(bundle_path=BUNDLE_PATH):
+    """Compiles the database into the memory-mapped bundle UmaBuddy looks events up in."""
+    start = time.perf_counter()
+    try:
+        keys, options, size = write_bundle(DB_PATH, bundle_path)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Could not write the event bundle: {e}")
+        return
+    print(f"Wrote {bundle_path}: {keys} events, {options} options, {size / 1024:.0f} KB "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build umamusume_events.db from GameTora character pages.")
+    parser.add_argument("--batch", metavar="PAGES_DIR", help="Directory of saved character pages to ingest")
+    parser.add_argument("--manifest", help="JSON file mapping page file names to character names (with --batch)")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-parse pages even if they haven't changed")
+    parser.add_argument("--parser", choices=("lxml", "bs4"), default=DEFAULT_PARSER, help="HTML parser to use")
+    parser.add_argument("--bundle", nargs="?", const=BUNDLE_PATH, metavar="PATH",
+                        help=f"Also compile the event bundle (default path: {BUNDLE_PATH})")
+    args = parser.parse_args()
+
+    if args.batch:
+        if not args.manifest:
+            parser.error("--batch needs a --manifest of character names")
+        ingest_saved_pages(args.batch, args.manifest, args.workers, args.force, args.parser)
+    else:
+        build_single_character_db(args.force, args.parser)
+
+    if args.bundle:
+        build_bundle(args.bundle)
@@ -0,0 +1,181 @@
+import bisect
+import json
+import threading
+import time
+
+# Upper bounds (in ms) of the latency histogram buckets; the last bucket is open-ended
+BUCKET_BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+DEFAULT_EXPORT_PATH = "metrics.jsonl"
+DEFAULT_EXPORT_INTERVAL = 10
+
+
+class Histogram:
+    """Fixed-bucket latency histogram in milliseconds."""
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value_ms):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        self.min = min(self.min, value_ms)
+        self.max = max(self.max, value_ms)
+
+    def percentile(self, pct):
+        """Estimates a percentile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return min(BUCKET_BOUNDS_MS[i], self.max) if i < len(BUCKET_BOUNDS_MS) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "min_ms": self.min if self.count else 0.0,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "buckets": self.buckets[:],
+        }
+
+
+class _Timer:
+    """Context manager that records how long its block took into a histogram."""
+
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class _NullTimer:
+    """Does nothing; shared by every timer of a disabled Metrics."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """
+    Per-stage timings and counters for the OCR engine.
+
+    Timings go into fixed-bucket histograms and counters are plain integers.
+    Snapshots can be appended to a JSONL file periodically. A disabled instance
+    hands out a shared no-op timer and ignores every call, so instrumented code
+    pays almost nothing when metrics are off.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.export_thread = None
+
+    def timer(self, name):
+        """Returns a context manager that times its block into the named histogram."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def observe(self, name, value_ms):
+        """Records one timing (in ms) into the named histogram."""
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value_ms)
+
+    def count(self, name, amount=1):
+        """Adds to the named counter."""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """Returns the current counters and histogram summaries as a JSON-friendly dict."""
+        with self.lock:
+            return {
+                "timestamp": time.time(),
+                "uptime_s": time.time() - self.started,
+                "counters": dict(self.counters),
+                "histograms": {name: h.snapshot() for name, h in self.histograms.items()},
+            }
+
+    def summary_text(self):
+        """A short one-line-per-stage readout, e.g. for the overlay."""
+        with self.lock:
+            lines = [f"{name}: p50 {h.percentile(50):.1f} ms, p99 {h.percentile(99):.1f} ms"
+                     for name, h in sorted(self.histograms.items())]
+            counters = ", ".join(f"{name} {value}" for name, value in sorted(self.counters.items()))
+        if counters:
+            lines.append(counters)
+        return "\n".join(lines)
+
+    def start_export(self, path=DEFAULT_EXPORT_PATH, interval=DEFAULT_EXPORT_INTERVAL):
+        """Appends a snapshot to a JSONL file every `interval` seconds on a background thread."""
+        if not self.enabled or self.export_thread is not None:
+            return
+
+        def export_loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    with open(path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(self.snapshot()) + "\n")
+                except OSError as e:
+                    print(f"Could not export metrics: {e}")
+
+        self.export_thread = threading.Thread(target=export_loop, name="umabuddy-metrics")
+        self.export_thread.daemon = True
+        self.export_thread.start()
+
+
+def create_metrics(settings):
+    """
+    Builds the Metrics object described by the "metrics" block of settings.json.
+
+    Exporting starts right away if an export_path is configured.
+    """
+    config = settings.get('metrics') or {}
+    metrics = Metrics(enabled=bool(config.get('enabled', False)))
+    if metrics.enabled and config.get('export_path', DEFAULT_EXPORT_PATH):
+        metrics.start_export(config.get('export_path', DEFAULT_EXPORT_PATH),
+                             config.get('export_interval', DEFAULT_EXPORT_INTERVAL))
+    return metrics
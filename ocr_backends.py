@@ -0,0 +1,250 @@
+import inspect
+import math
+
+import cv2
+
+from preprocess import RECOGNIZER_HEIGHT
+
+# Backend each region is read with, unless settings.json names one in "ocr_backends":
+# "easyocr", "tesseract", or "cascade" (Tesseract first, EasyOCR when the read isn't a known name or title).
+# Tesseract is opt-in: it needs pytesseract and a Tesseract install at tesseract_path.
+DEFAULT_REGION_BACKENDS = {
+    "character_region": "easyocr",
+    "event_region": "easyocr",
+}
+
+# Tesseract page segmentation mode 7: treat the image as a single line of text
+TESSERACT_PSM = 7
+
+# Leading (positional) parameters of easyocr.recognition.get_text that read_lines relies on,
+# and the keyword ones it passes; get_text isn't public API, so other versions are checked first
+GET_TEXT_POSITIONAL = ("character", "imgH", "imgW", "recognizer", "converter", "image_list", "ignore_char")
+GET_TEXT_KEYWORDS = ("batch_size", "workers", "device")
+
+
+def find_get_text():
+    """
+    EasyOCR's internal batched recognizer, if the installed version has one read_lines can call.
+
+    Returns:
+        easyocr.recognition.get_text, or None if it's missing or its signature changed.
+    """
+    try:
+        from easyocr.recognition import get_text
+        parameters = list(inspect.signature(get_text).parameters)
+    except (ImportError, TypeError, ValueError):
+        return None
+    if tuple(parameters[:len(GET_TEXT_POSITIONAL)]) != GET_TEXT_POSITIONAL:
+        return None
+    if any(name not in parameters for name in GET_TEXT_KEYWORDS):
+        return None
+    return get_text
+
+
+class OcrBackend:
+    """Reads the text in a batch of single-line regions."""
+
+    name = None
+
+    def prepare(self, img_bgra):
+        """
+        Args:
+            img_bgra (np.ndarray): An HxWx4 BGRA region, as returned by the capture backend.
+
+        Returns:
+            A tuple of (image, has_contrast): the image to hand to read() and
+            whether it can possibly hold text.
+        """
+        raise NotImplementedError
+
+    def read(self, images, allowlist=None):
+        """
+        Args:
+            images (list): Images returned by prepare().
+            allowlist (str): Characters the backend may output, or None for any.
+
+        Returns:
+            One list of EasyOCR-style (box, text, confidence) results per image.
+        """
+        raise NotImplementedError
+
+
+class EasyOcrBackend(OcrBackend):
+    """EasyOCR, either the recognizer alone on batched lines or the full detector pipeline."""
+
+    name = "easyocr"
+
+    def __init__(self, reader, preprocessor, ocr_mode, min_text_confidence):
+        self.reader = reader
+        self.preprocessor = preprocessor
+        self.ocr_mode = ocr_mode
+        self.min_text_confidence = min_text_confidence
+
+        self.get_text = None
+        if reader is not None and ocr_mode == "recognize":
+            self.get_text = find_get_text()
+            if self.get_text is None:
+                print("This EasyOCR version has no compatible batched recognizer (easyocr.recognition.get_text); "
+                      "reading regions one at a time with Reader.recognize.")
+
+    def prepare(self, img_bgra):
+        if self.ocr_mode == "recognize":
+            return self.preprocessor.apply(img_bgra)
+        # The capture is a BGRA view; EasyOCR gets its own RGB copy
+        return cv2.cvtColor(img_bgra, cv2.COLOR_BGRA2RGB), True
+
+    def read(self, images, allowlist=None):
+        if self.ocr_mode == "recognize":
+            return self.read_lines(images, allowlist)
+        return [self.reader.readtext(img, allowlist=allowlist) for img in images]
+
+    def read_lines(self, images, allowlist=None):
+        """
+        Runs only EasyOCR's recognizer on several preprocessed regions at once.
+
+        Reader.recognize loops over its boxes one by one on CPU, so the regions
+        are handed straight to EasyOCR's get_text as one image list and go
+        through the recognizer as a single batch. EasyOCR versions without a
+        compatible get_text fall back to Reader.recognize, one region at a time.
+
+        Args:
+            images (list): Preprocessed regions, all grayscale or all RGB.
+            allowlist (str): Characters the recognizer may output, or None for any.
+
+        Returns:
+            One list of EasyOCR-style (box, text, confidence) results per image,
+            with boxes relative to that image and low-confidence reads left out.
+        """
+        if self.get_text is None:
+            return [self.recognize_line(img, allowlist) for img in images]
+
+        reader = self.reader
+        image_list = []
+        max_ratio = 1.0
+        for img in images:
+            if img.ndim == 3:
+                img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+            height, width = img.shape
+            if height != RECOGNIZER_HEIGHT:
+                width = max(1, int(round(width * RECOGNIZER_HEIGHT / height)))
+                img = cv2.resize(img, (width, RECOGNIZER_HEIGHT), interpolation=cv2.INTER_CUBIC)
+            box = [[0, 0], [width, 0], [width, RECOGNIZER_HEIGHT], [0, RECOGNIZER_HEIGHT]]
+            image_list.append((box, img))
+            max_ratio = max(max_ratio, width / RECOGNIZER_HEIGHT)
+
+        # Same character filtering as Reader.recognize
+        if allowlist:
+            ignore_char = ''.join(set(reader.character) - set(allowlist))
+        else:
+            ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+
+        # One result per image, in order
+        results = self.get_text(reader.character, RECOGNIZER_HEIGHT, math.ceil(max_ratio) * RECOGNIZER_HEIGHT,
+                                reader.recognizer, reader.converter, image_list, ignore_char,
+                                batch_size=len(image_list), workers=0, device=reader.device)
+
+        per_image = []
+        for img, (box, text, prob) in zip(images, results):
+            if prob < self.min_text_confidence:
+                per_image.append([])
+                continue
+            # Back to the coordinates of the image that was passed in
+            scale = img.shape[0] / RECOGNIZER_HEIGHT
+            per_image.append([([[x * scale, y * scale] for x, y in box], text, prob)])
+        return per_image
+
+    def recognize_line(self, img, allowlist=None):
+        """Reads one preprocessed region through EasyOCR's public Reader.recognize."""
+        height, width = img.shape[:2]
+        results = self.reader.recognize(img, horizontal_list=[[0, width, 0, height]], free_list=[], detail=1,
+                                        allowlist=allowlist)
+        return [res for res in results if res[2] >= self.min_text_confidence]
+
+
+class TesseractBackend(OcrBackend):
+    """Tesseract in single-line mode: no detector and no torch, so much cheaper per region."""
+
+    name = "tesseract"
+
+    def __init__(self, preprocessor, min_text_confidence, tesseract_path=None):
+        """
+        Raises:
+            ImportError: If pytesseract is not installed.
+            RuntimeError: If the Tesseract executable can't be run.
+        """
+        import pytesseract
+        if tesseract_path:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_path
+        try:
+            pytesseract.get_tesseract_version()
+        except (pytesseract.TesseractNotFoundError, OSError) as e:
+            raise RuntimeError(f"Tesseract could not be run ({tesseract_path or 'tesseract'}): {e}")
+        self.pytesseract = pytesseract
+        self.preprocessor = preprocessor
+        self.min_text_confidence = min_text_confidence
+
+    def prepare(self, img_bgra):
+        img, has_contrast = self.preprocessor.apply(img_bgra)
+        # Tesseract is trained on dark text on a light background
+        if has_contrast and img.mean() < 128:
+            img = 255 - img
+        return img, has_contrast
+
+    def read(self, images, allowlist=None):
+        config = f"--psm {TESSERACT_PSM}"
+        if allowlist:
+            # pytesseract splits the config on whitespace (and only honours quotes on POSIX),
+            # so spaces and quotes are left out; Tesseract separates words by itself
+            allowed = ''.join(c for c in allowlist if not c.isspace() and c not in "'\"\\")
+            config += f" -c tessedit_char_whitelist={allowed}"
+        return [self.read_line(img, config) for img in images]
+
+    def read_line(self, img, config):
+        data = self.pytesseract.image_to_data(img, config=config, output_type=self.pytesseract.Output.DICT)
+        words = []
+        confidences = []
+        for text, conf in zip(data["text"], data["conf"]):
+            # Layout rows (page, block, line) have a confidence of -1
+            if float(conf) < 0 or not text.strip():
+                continue
+            words.append(text.strip())
+            confidences.append(float(conf) / 100)
+        if not words:
+            return []
+        prob = sum(confidences) / len(confidences)
+        if prob < self.min_text_confidence:
+            return []
+        height, width = img.shape[:2]
+        return [([[0, 0], [width, 0], [width, height], [0, height]], ' '.join(words), prob)]
+
+
+def create_backends(settings, reader, preprocessor, ocr_mode, min_text_confidence):
+    """
+    Builds the backend used for each region from the "ocr_backends" block of settings.json.
+
+    Returns:
+        A tuple of (backends, region_backends): backends maps "easyocr" (always
+        present) and "tesseract" (when some region uses it and it can run) to
+        OcrBackend instances; region_backends maps each region to "easyocr",
+        "tesseract" or "cascade".
+    """
+    backends = {"easyocr": EasyOcrBackend(reader, preprocessor, ocr_mode, min_text_confidence)}
+    region_backends = dict(DEFAULT_REGION_BACKENDS, **(settings.get('ocr_backends') or {}))
+
+    unknown = {region: name for region, name in region_backends.items()
+               if name not in ("easyocr", "tesseract", "cascade")}
+    for region, name in unknown.items():
+        print(f"Unknown OCR backend '{name}' for {region}, using EasyOCR.")
+        region_backends[region] = "easyocr"
+
+    if any(name != "easyocr" for name in region_backends.values()):
+        try:
+            backends["tesseract"] = TesseractBackend(preprocessor, min_text_confidence,
+                                                     settings.get('tesseract_path'))
+        except ImportError:
+            print("pytesseract is not installed, reading every region with EasyOCR.")
+        except RuntimeError as e:
+            print(f"{e}\nReading every region with EasyOCR.")
+        if "tesseract" not in backends:
+            region_backends = {region: "easyocr" for region in region_backends}
+    return backends, region_backends
@@ -1,32 +1,88 @@
-import cv2
-from PIL import ImageGrab
-import numpy as np
-import easyocr
 import json
 import time
 import re
 import threading
+import atexit
 from pynput import keyboard
-from database import get_event_outcomes
+from database import get_event_outcomes, configure_event_store, HotSet
+from frame_gate import FrameGate, DEFAULT_CHANGE_THRESHOLD
+from title_index import (TitleIndex, CharacterResolver, DEFAULT_MIN_SCORE, DEFAULT_CHARACTER_MIN_SCORE,
+                         DEFAULT_CHARACTER_VOTE_WINDOW, DEFAULT_CHARACTER_VOTES_NEEDED)
+from banner_cache import BannerCache, fingerprint, CACHE_PATH, DEFAULT_MIN_CONFIDENCE
+from screen_capture import create_capture
+from pipeline import DropOldestQueue, QueueClosed, Frame, OcrResult
+from debug_capture import DebugRecorder, DEFAULT_AUTO_FLUSH, DEFAULT_BUFFER_SIZE, DEFAULT_MAX_DUMPS
+from ocr_warmup import get_reader
+from metrics import create_metrics
+from ocr_backends import create_backends
+from scheduler import create_scheduler
+from banner_detector import create_detector
+from preprocess import Preprocessor
 
 # --- Visual Debugger ---
+# Keeps the last few OCR'd frames in memory; press F9 (or miss a lookup) to save them
 SAVE_DEBUG_IMAGES = True
 
+# How often (in seconds) the OCR run/skip counts are printed
+GATE_REPORT_INTERVAL = 60
+
+# How often (in seconds) new banner cache entries are written to disk
+CACHE_SAVE_INTERVAL = 30
+
+# How often (in seconds) the stats readout on the overlay is refreshed
+STATS_OVERLAY_INTERVAL = 2
+
+# "recognize" reads each region as a single line with the recognizer alone;
+# "detect" runs EasyOCR's full text detector first (readtext)
+DEFAULT_OCR_MODE = "recognize"
+
+# In recognize mode every region yields some text; reads below this confidence are treated as no text
+DEFAULT_MIN_TEXT_CONFIDENCE = 0.2
+
+# Whether the character region keeps being read while looking for events, so that going
+# back to character select switches state without pressing F10
+DEFAULT_WATCH_CHARACTER_REGION = True
+
 
 class OcrEngine:
     """Manages the OCR process using the EasyOCR library."""
 
-    def __init__(self, overlay_widget):
+    def __init__(self, overlay_widget, settings=None, capture=None, headless=False, load_reader=True):
+        """
+        Args:
+            overlay_widget: The OverlayWindow (or any object with update_outcomes
+                and clear_outcomes) that shows the outcomes.
+            settings (dict): Settings to use instead of reading settings.json.
+            capture (CaptureBackend): Capture backend to use instead of the one
+                named in the settings.
+            headless (bool): Skips the hotkey listener and debug recorder, for
+                running without a desktop session (e.g. replay benchmarks).
+            load_reader (bool): Whether to load the EasyOCR model. Without it the
+                engine can only run the state machine on results read elsewhere
+                (e.g. by headless worker processes).
+        """
         self.overlay = overlay_widget
-        self.settings = self.load_settings()
+        self.settings = settings if settings is not None else self.load_settings()
         if not self.settings:
             self.engine_ok = False
             return
 
-        print("Initializing EasyOCR... (This may take a moment)")
-        # This is the line that will trigger the one-time model download.
-        self.reader = easyocr.Reader(['en'])
-        print("EasyOCR initialized successfully.")
+        try:
+            self.capture = capture if capture is not None else create_capture(self.settings)
+        except (ValueError, OSError) as e:
+            print(f"Could not set up screen capture: {e}")
+            self.engine_ok = False
+            return
+
+        # Usually already loaded by the warm-up started with the settings window
+        self.reader = None
+        if load_reader:
+            try:
+                self.reader = get_reader(self.settings)
+            except RuntimeError as e:
+                print(e)
+                self.engine_ok = False
+                return
         self.engine_ok = True
 
         self.overlay.clear_outcomes()
@@ -38,12 +94,100 @@ class OcrEngine:
 
         self.current_character_candidate = ""
         self.last_seen_event = ""
+        # Titles (and their characters) that can appear for the confirmed character
+        self.event_vocabulary = None
+        # Every event of the confirmed character and 'Common', loaded into memory on confirmation
+        self.hot_set = None
+        # Title of the event whose outcomes are on the overlay, if any
+        self.displayed_event = None
+        self.lookups = 0
+        self.lookup_hits = 0
+        # Times a character was confirmed and times character select was detected while looking for
+        # events; both can happen on one frame, so the state alone doesn't show every switch
+        self.confirmations = 0
+        self.character_selects = 0
+        self.state_lock = threading.RLock()
+
+        # Pipeline: capture -> OCR -> lookup -> render, each stage on its own thread.
+        # Every queue keeps only the newest items so stale frames are never read.
+        # Capture polls fast while the screen changes and backs off when idle, within a CPU budget
+        self.scheduler = create_scheduler(self.settings)
+        self.frame_queue = DropOldestQueue(maxsize=1)
+        self.ocr_queue = DropOldestQueue(maxsize=4)
+        self.render_queue = DropOldestQueue(maxsize=4)
+        self.running = False
+        self.pipelined = False
+
+        # Per-stage timings and counters (no-ops unless enabled in settings.json)
+        self.metrics = create_metrics(self.settings)
+        self.show_stats = self.metrics.enabled and (self.settings.get('metrics') or {}).get('overlay_stats', False)
+        self.last_stats_update = 0.0
+
+        # The regions are drawn around a single line of text, so the text detector can be skipped
+        self.ocr_mode = self.settings.get('ocr_mode', DEFAULT_OCR_MODE)
+        self.preprocessor = Preprocessor(self.settings.get('preprocess'))
+        self.min_text_confidence = self.settings.get('min_text_confidence', DEFAULT_MIN_TEXT_CONFIDENCE)
+        # EasyOCR, Tesseract or a Tesseract-then-EasyOCR cascade, chosen per region
+        self.backends, self.region_backends = create_backends(self.settings, self.reader, self.preprocessor,
+                                                              self.ocr_mode, self.min_text_confidence)
+
+        # Change detection: OCR only runs on regions that changed since the last read
+        self.frame_gate = FrameGate(self.settings.get('change_threshold', DEFAULT_CHANGE_THRESHOLD))
+        self.last_gate_report = time.time()
+
+        # Lookups go through the precompiled event bundle when there is a current one
+        configure_event_store(self.settings)
+
+        # Approximate title matching so a single misread character still finds the event
+        self.title_index = TitleIndex.from_database()
+        self.fuzzy_min_score = self.settings.get('fuzzy_min_score', DEFAULT_MIN_SCORE)
+
+        # Character reads are matched against the characters in the database and voted on.
+        # Reading a different one while looking for events means the user went back to character select.
+        self.watch_character_region = self.settings.get('watch_character_region', DEFAULT_WATCH_CHARACTER_REGION)
+        self.character_names = self.title_index.character_names()
+        self.name_characters = set(''.join(self.character_names))
+        self.character_resolver = CharacterResolver(
+            self.character_names,
+            min_score=self.settings.get('character_min_score', DEFAULT_CHARACTER_MIN_SCORE),
+            window=self.settings.get('character_vote_window', DEFAULT_CHARACTER_VOTE_WINDOW),
+            votes_needed=self.settings.get('character_votes_needed', DEFAULT_CHARACTER_VOTES_NEEDED))
+        # Leaving the event state takes the same vote, even for exact reads, so stray UI text can't end a run
+        self.select_resolver = CharacterResolver(
+            self.character_names,
+            min_score=self.character_resolver.min_score,
+            window=self.character_resolver.votes.maxlen,
+            votes_needed=self.character_resolver.votes_needed,
+            exact_confirms=False)
+
+        # Event region frames without a banner skip OCR (once banner_detector.py has been calibrated)
+        self.banner_detector = create_detector(self.settings)
+        if self.banner_detector:
+            print("Banner detector loaded: OCR only runs while an event banner is on screen.")
+
+        # Banners that were read before resolve from the cache without running OCR
+        self.banner_cache = BannerCache(self.settings.get('banner_cache_path', CACHE_PATH))
+        self.cache_min_confidence = self.settings.get('cache_min_confidence', DEFAULT_MIN_CONFIDENCE)
+        self.last_cache_save = time.time()
+        atexit.register(self.banner_cache.save)
+
+        # In-memory ring buffer of recent OCR frames, written out on demand
+        self.debug_recorder = None
+        if SAVE_DEBUG_IMAGES and not headless:
+            self.debug_recorder = DebugRecorder(self.settings.get('debug_buffer_size', DEFAULT_BUFFER_SIZE),
+                                                auto_flush=self.settings.get('debug_auto_flush', DEFAULT_AUTO_FLUSH),
+                                                max_dumps=self.settings.get('debug_max_dumps', DEFAULT_MAX_DUMPS))
+
+        if headless:
+            return
 
         # Start the hotkey listener in a background thread
         self.listener_thread = threading.Thread(target=self.start_hotkey_listener)
         self.listener_thread.daemon = True
         self.listener_thread.start()
         print("Hotkey listener started. Press F10 at any time to reset character search.")
+        if self.debug_recorder:
+            print("Press F9 to save the last few OCR frames to the debug_captures folder.")
 
     def load_settings(self):
         """Loads configuration from settings.json."""
@@ -58,10 +202,18 @@ class OcrEngine:
 
     def reset_search(self):
         """Resets the state to search for a new character."""
-        self.current_state = self.STATE_SEARCH_CHAR
-        self.current_character_candidate = ""
-        self.last_seen_event = ""
-        self.overlay.clear_outcomes()
+        with self.state_lock:
+            self.current_state = self.STATE_SEARCH_CHAR
+            self.current_character_candidate = ""
+            self.last_seen_event = ""
+            self.event_vocabulary = None
+            self.hot_set = None
+            self.character_resolver.reset()
+            self.select_resolver.reset()
+            self.displayed_event = None
+            self.frame_gate.reset()
+        self.scheduler.wake()
+        self.clear_overlay()
         print("\n--- HOTKEY PRESSED: RESETTING ---")
         print("Now searching for a character name on the selection screen...")
 
@@ -72,93 +224,412 @@ class OcrEngine:
     def on_press(self, key):
         if key == keyboard.Key.f10:
             self.reset_search()
+        elif key == keyboard.Key.f9 and self.debug_recorder:
+            self.debug_recorder.request_flush("hotkey")
 
     def clean_text(self, text):
         """Strips all non-alphanumeric characters from text for reliable matching."""
         return re.sub(r'[^a-zA-Z0-9\s]', '', text).strip()
 
-    def main_loop(self):
-        """The main OCR processing loop that runs continuously."""
-        if not self.engine_ok:
-            print("OCR engine did not start due to an initialization error.")
-            return
+    def lookup_event(self, cleaned_text, event_title):
+        """
+        Looks up an event by the title the OCR stage resolved its text to.
 
-        print(f"Starting OCR engine. Initial state: {self.current_state}")
+        Args:
+            cleaned_text (str): The text that was read.
+            event_title (str): The confirmed character's title the text was
+                snapped to, or "" if it matched none.
 
-        try:
-            while True:
-                if self.current_state == self.STATE_SEARCH_CHAR:
-                    region = self.settings.get('character_region')
-                    if not region:
-                        time.sleep(5)
-                        continue
+        Returns:
+            A tuple of (event_title, outcomes) where event_title is the title the
+            outcomes were found under (the text itself when nothing matched).
+        """
+        if not event_title:
+            return cleaned_text, []
+        return event_title, self.get_outcomes(event_title)
+
+    def get_outcomes(self, event_title):
+        """Outcomes of an event for the current character, from the hot set when one is loaded."""
+        if self.hot_set is not None:
+            with self.metrics.timer("hot_set_lookup"):
+                return self.hot_set.get(event_title)
+        with self.metrics.timer("get_event_outcomes"):
+            return get_event_outcomes(event_title, self.current_character_candidate)
+
+    def housekeeping(self):
+        """Prints the change-detection counts now and then and saves the banner cache."""
+        now = time.time()
+        if now - self.last_gate_report >= GATE_REPORT_INTERVAL:
+            print(self.frame_gate.report())
+            print(self.scheduler.report())
+            print(f"Banner cache hits: {self.banner_cache.hits}, misses: {self.banner_cache.misses}")
+            print(f"Frames dropped as stale: capture {self.frame_queue.dropped}, OCR {self.ocr_queue.dropped}")
+            self.last_gate_report = now
+        if now - self.last_cache_save >= CACHE_SAVE_INTERVAL:
+            self.banner_cache.save()
+            self.last_cache_save = now
+        if self.show_stats and now - self.last_stats_update >= STATS_OVERLAY_INTERVAL:
+            self.render_queue.put(("stats", f"{self.metrics.summary_text()}\n{self.scheduler.report()}"))
+            self.last_stats_update = now
+
+    def show_outcomes(self, outcome_descriptions):
+        """Sends outcomes to the render stage (or straight to the overlay when not pipelined)."""
+        if self.pipelined:
+            self.render_queue.put(("update", outcome_descriptions))
+        else:
+            self.overlay.update_outcomes(outcome_descriptions)
+
+    def clear_overlay(self):
+        """Asks the render stage (or the overlay directly when not pipelined) to hide outcomes."""
+        if self.pipelined:
+            self.render_queue.put(("clear", None))
+        else:
+            self.overlay.clear_outcomes()
+
+    # --- Pipeline stages ---
+
+    def watched_regions(self, state):
+        """
+        The regions read each tick in a state. While looking for events the
+        character region is watched too, to notice a return to character select.
+        """
+        if state == self.STATE_SEARCH_CHAR:
+            return ('character_region',)
+        if self.watch_character_region:
+            return ('character_region', 'event_region')
+        return ('event_region',)
+
+    def recognize(self, frame, state):
+        """
+        OCR stage: reads the regions that matter for the given state, with the
+        OCR backend configured for each region (one batched call per backend).
 
-                    bbox = (region['left'], region['top'], region['left'] + region['width'],
-                            region['top'] + region['height'])
-                    img_pil = ImageGrab.grab(bbox=bbox)
-                    img_np = np.array(img_pil)
-                    results = self.reader.readtext(img_np)
-                    # Combine results into a single string
-                    text = ' '.join([res[1] for res in results])
-                    cleaned_text = self.clean_text(text)
-
-                    if SAVE_DEBUG_IMAGES:
-                        # Draw boxes for debugging
-                        for (bbox, text, prob) in results:
-                            (top_left, top_right, bottom_right, bottom_left) = bbox
-                            top_left = tuple(map(int, top_left))
-                            bottom_right = tuple(map(int, bottom_right))
-                            cv2.rectangle(img_np, top_left, bottom_right, (0, 255, 0), 2)
-                        # Convert back to BGR for saving with cv2
-                        img_bgr = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
-                        cv2.imwrite("debug_char_region.png", img_bgr)
-
-                    if cleaned_text and cleaned_text != self.current_character_candidate:
-                        self.current_character_candidate = cleaned_text
-                        print(f"Candidate character found: {self.current_character_candidate}")
-                    elif not cleaned_text and self.current_character_candidate:
-                        print(f"\n--- CHARACTER CONFIRMED: {self.current_character_candidate} ---")
-                        self.current_state = self.STATE_SEARCH_EVENT
-                        print("Switching state: Now searching for in-game events...")
-
-                elif self.current_state == self.STATE_SEARCH_EVENT:
-                    region = self.settings.get('event_region')
-                    if not region:
-                        time.sleep(5)
+        Returns:
+            A list of OcrResults, one per region that is present and changed.
+        """
+        cached = []
+        pending = []
+        for region in self.watched_regions(state):
+            img_np = frame.regions.get(region)
+            if img_np is None:
+                continue
+            if not self.frame_gate.should_process(region, img_np):
+                self.metrics.count("unchanged_skips")
+                # While a character vote is open, an unchanged region counts as the same read again
+                if region == 'character_region':
+                    resolver = self.character_resolver if state == self.STATE_SEARCH_CHAR else self.select_resolver
+                    # The lookup stage updates the resolver under state_lock
+                    with self.state_lock:
+                        voting, last_text = resolver.pending, resolver.last_text
+                    if voting:
+                        cached.append(OcrResult(frame, state, region, last_text, from_cache=True))
+                continue
+
+            banner_key = None
+            if region == 'event_region':
+                if self.banner_detector:
+                    with self.metrics.timer("banner_detect"):
+                        has_banner = self.banner_detector.is_present(img_np)
+                    if not has_banner:
+                        # Read as no text, which clears the overlay without running OCR
+                        self.metrics.count("no_banner_skips")
+                        cached.append(OcrResult(frame, state, region, "", []))
                         continue
+                banner_key = fingerprint(img_np)
+                cached_title = self.banner_cache.get(banner_key, accept=self.is_current_event)
+                if cached_title is not None:
+                    self.metrics.count("cache_hits")
+                    cached.append(OcrResult(frame, state, region, cached_title, banner_key=banner_key,
+                                            from_cache=True, event_title=cached_title))
+                    continue
+            pending.append((region, img_np, banner_key))
+
+        if not pending:
+            return cached
+
+        vocabulary = self.event_vocabulary if state == self.STATE_SEARCH_EVENT else None
+        allowlist = None
+        if vocabulary and vocabulary.allowlist:
+            # One call reads every region, so the allowlist has to cover the character names too
+            allowlist = ''.join(sorted(set(vocabulary.allowlist) | self.name_characters))
+
+        # Regions read by Tesseract go first; cascaded ones only go on to EasyOCR
+        # when Tesseract's read isn't a known name or title
+        reads = [None] * len(pending)
+        first = [i for i, (region, _, _) in enumerate(pending) if self.region_backends.get(region, "easyocr") != "easyocr"]
+        if first:
+            for i, read in zip(first, self.read_with("tesseract", [pending[i][1] for i in first], allowlist)):
+                reads[i] = read
+        second = []
+        for i, (region, _, _) in enumerate(pending):
+            if reads[i] is None:
+                second.append(i)
+            elif self.region_backends.get(region) == "cascade" and reads[i][2]:
+                cleaned_text = self.clean_text(' '.join([res[1] for res in reads[i][1]]))
+                if not self.is_known_text(region, cleaned_text, vocabulary):
+                    self.metrics.count("cascade_fallbacks")
+                    second.append(i)
+        if second:
+            for i, read in zip(second, self.read_with("easyocr", [pending[i][1] for i in second], allowlist)):
+                reads[i] = read
+
+        ocr_results = cached
+        for (region, _, banner_key), (img_np, results, _) in zip(pending, reads):
+            with self.metrics.timer("clean_text"):
+                # Combine results into a single string
+                text = ' '.join([res[1] for res in results])
+                cleaned_text = self.clean_text(text)
+
+            # Snap the text to one of the character's titles, so the lookup stage gets an exact key
+            event_title = None
+            if vocabulary and cleaned_text and region == 'event_region':
+                with self.metrics.timer("rescore"):
+                    event_title, _ = vocabulary.resolve(cleaned_text, self.fuzzy_min_score)
+
+            if self.debug_recorder:
+                self.debug_recorder.record(region, img_np, results, cleaned_text)
+
+            ocr_results.append(OcrResult(frame, state, region, cleaned_text, results, banner_key,
+                                         event_title=event_title))
+        # The character region goes first, so a return to character select is handled before the event
+        ocr_results.sort(key=lambda r: r.region != 'character_region')
+        return ocr_results
+
+    def read_with(self, name, regions, allowlist=None):
+        """
+        Reads several captured regions with one OCR backend, in a single call.
+
+        Returns:
+            One tuple of (image read, results, has_contrast) per region.
+        """
+        backend = self.backends[name]
+        with self.metrics.timer("preprocess"):
+            prepared = [backend.prepare(img_np) for img_np in regions]
+        # A flat region can't hold a banner, so there is nothing to read
+        readable = [img for img, has_contrast in prepared if has_contrast]
+        if len(readable) < len(prepared):
+            self.metrics.count("blank_regions", len(prepared) - len(readable))
+        read = iter(())
+        if readable:
+            if name == "tesseract":
+                timer = "tesseract"
+                self.metrics.count("tesseract_runs", len(readable))
+            else:
+                timer = "recognize" if self.ocr_mode == "recognize" else "readtext"
+            with self.metrics.timer(timer):
+                read = iter(backend.read(readable, allowlist))
+            self.metrics.count("ocr_runs", len(readable))
+        return [(img, next(read) if has_contrast else [], has_contrast) for img, has_contrast in prepared]
+
+    def is_current_event(self, event_title):
+        """Whether a title is one of the confirmed character's events (or a 'Common' one)."""
+        if self.event_vocabulary is not None:
+            return event_title in self.event_vocabulary.titles
+        return self.hot_set is not None and event_title in self.hot_set
+
+    def is_known_text(self, region, cleaned_text, vocabulary):
+        """Whether a read names a character in the roster, or (in the event region) a known event."""
+        if not cleaned_text:
+            return False
+        if region == 'character_region':
+            return self.character_resolver.match(cleaned_text)[0] is not None
+        if vocabulary:
+            return bool(vocabulary.resolve(cleaned_text, self.fuzzy_min_score)[0])
+        title, score = self.title_index.best_match(cleaned_text, self.current_character_candidate)
+        return title is not None and score >= self.fuzzy_min_score
+
+    def handle_result(self, result):
+        """Lookup stage: advances the character/event state machine with one OCR result."""
+        with self.state_lock:
+            # The state changed (e.g. F10 was pressed) while this frame was being read
+            if result.state != self.current_state:
+                return
+            cleaned_text = result.cleaned_text
+
+            if result.region == 'character_region':
+                self.handle_character_text(cleaned_text)
+
+            elif self.current_state == self.STATE_SEARCH_EVENT:
+                # Different misreadings of one banner resolve to the same title and are looked up once
+                seen_event = result.event_title or cleaned_text
+                if cleaned_text and seen_event != self.last_seen_event:
+                    print(f"\nDetected event: '{cleaned_text}'")
+                    if result.event_title and result.event_title != cleaned_text:
+                        print(f"-> Closest known event: '{result.event_title}'")
+                    event_title, outcomes = self.lookup_event(cleaned_text, result.event_title)
+                    self.lookups += 1
+
+                    # Remember confidently read banners that resolved to a known event
+                    results = result.results
+                    if outcomes and results and min(prob for _, _, prob in results) >= self.cache_min_confidence:
+                        self.banner_cache.put(result.banner_key, event_title)
+
+                    if outcomes:
+                        outcome_descriptions = [desc for _, desc in outcomes]
+                        self.show_outcomes(outcome_descriptions)
+                        self.displayed_event = event_title
+                        self.lookup_hits += 1
+                        print(f"-> Displaying {len(outcomes)} outcomes on overlay.")
+                    else:
+                        self.clear_overlay()
+                        self.displayed_event = None
+                        self.metrics.count("lookup_misses")
+                        print(f"-> Event not found for '{self.current_character_candidate}' or in 'Common' events.")
+                        if self.debug_recorder:
+                            self.debug_recorder.request_flush("lookup_miss", automatic=True)
+
+                    self.last_seen_event = seen_event
+                elif not cleaned_text:
+                    self.last_seen_event = ""
+                    self.displayed_event = None
+                    self.clear_overlay()
+
+    def handle_character_text(self, cleaned_text):
+        """Character part of the state machine; called with state_lock held."""
+        if self.current_state == self.STATE_SEARCH_EVENT:
+            # A different character in the character region means character select is back on screen.
+            # Reads of the current character count as votes against leaving.
+            text = cleaned_text
+            if text and self.select_resolver.match(text)[0] == self.current_character_candidate:
+                text = ""
+            name = self.select_resolver.observe(text)
+            if name is None:
+                return
+            print(f"\n--- CHARACTER SELECT DETECTED: {name} ---")
+            self.character_selects += 1
+            self.current_state = self.STATE_SEARCH_CHAR
+            self.current_character_candidate = ""
+            self.last_seen_event = ""
+            self.event_vocabulary = None
+            self.hot_set = None
+            self.displayed_event = None
+            self.frame_gate.reset('event_region')
+            self.clear_overlay()
+            print("Switching state: Now searching for a character...")
+
+        if not self.character_names:
+            # No characters in the database to match against: confirm whatever was
+            # read once the name disappears from the region
+            if cleaned_text and cleaned_text != self.current_character_candidate:
+                self.current_character_candidate = cleaned_text
+                print(f"Candidate character found: {self.current_character_candidate}")
+            elif not cleaned_text and self.current_character_candidate:
+                self.confirm_character(self.current_character_candidate)
+            return
+
+        confirmed = self.character_resolver.observe(cleaned_text)
+        if confirmed:
+            self.confirm_character(confirmed)
+            return
+        leader = self.character_resolver.leader
+        if leader and leader != self.current_character_candidate:
+            self.current_character_candidate = leader
+            print(f"Candidate character found: {leader} (read as '{cleaned_text}')")
+
+    def confirm_character(self, character_name):
+        """Switches to looking for the confirmed character's events."""
+        print(f"\n--- CHARACTER CONFIRMED: {character_name} ---")
+        self.confirmations += 1
+        self.current_character_candidate = character_name
+        self.current_state = self.STATE_SEARCH_EVENT
+        self.select_resolver.reset()
+        self.event_vocabulary = self.title_index.vocabulary(character_name)
+        self.hot_set = HotSet.load(character_name)
+        print("Switching state: Now searching for in-game events...")
+        print(f"Event recognition narrowed to {len(self.event_vocabulary.titles)} known titles.")
+        if self.hot_set is not None:
+            self.metrics.observe("hot_set_load", self.hot_set.load_ms)
+            print(f"Loaded {len(self.hot_set)} events into memory ({self.hot_set.memory_bytes() / 1024:.0f} KB) "
+                  f"in {self.hot_set.load_ms:.1f} ms.")
+
+    def process_frame(self, frame):
+        """Runs one frame through the OCR and lookup stages on the calling thread."""
+        results = self.recognize(frame, self.current_state)
+        for result in results:
+            self.handle_result(result)
+        return results
 
-                    bbox = (region['left'], region['top'], region['left'] + region['width'],
-                            region['top'] + region['height'])
-                    img_pil = ImageGrab.grab(bbox=bbox)
-                    img_np = np.array(img_pil)
-
-                    results = self.reader.readtext(img_np)
-                    text = ' '.join([res[1] for res in results])
-                    cleaned_text = self.clean_text(text)
-
-                    if cleaned_text and cleaned_text != self.last_seen_event:
-                        print(f"\nDetected event: '{cleaned_text}'")
-                        outcomes = get_event_outcomes(cleaned_text, self.current_character_candidate)
-
-                        if outcomes:
-                            outcome_descriptions = [desc for _, desc in outcomes]
-                            self.overlay.update_outcomes(outcome_descriptions)
-                            print(f"-> Displaying {len(outcomes)} outcomes on overlay.")
-                        else:
-                            self.overlay.clear_outcomes()
-                            print(f"-> Event not found for '{self.current_character_candidate}' or in 'Common' events.")
-
-                        self.last_seen_event = cleaned_text
-                    elif not cleaned_text:
-                        self.last_seen_event = ""
-                        self.overlay.clear_outcomes()
-
-                # Main loop delay
-                time.sleep(1)
+    def capture_loop(self):
+        """Capture stage: samples the screen at the scheduler's rate, whatever the later stages are doing."""
+        index = 0
+        while self.running:
+            started = time.perf_counter()
+            with self.metrics.timer("grab"):
+                regions = self.capture.grab()
+            self.frame_queue.put(Frame(index, time.time(), regions))
+            self.metrics.count("frames_captured")
+            index += 1
+            self.housekeeping()
+            interval = self.scheduler.next_interval()
+            self.metrics.observe("poll_interval", interval * 1000)
+            time.sleep(max(0.0, interval - (time.perf_counter() - started)))
+
+    def ocr_loop(self):
+        """OCR stage: reads the newest captured frame for the current state."""
+        while self.running:
+            frame = self.frame_queue.get()
+            started = time.perf_counter()
+            results = self.recognize(frame, self.current_state)
+            # Frames where every region was unchanged come back empty
+            self.scheduler.record(time.perf_counter() - started, active=bool(results))
+            if results:
+                # All regions of a tick travel together, so none is dropped without the others
+                self.ocr_queue.put(results)
+
+    def lookup_loop(self):
+        """Lookup stage: feeds OCR results through the state machine in order."""
+        while self.running:
+            for result in self.ocr_queue.get():
+                self.handle_result(result)
+
+    def render_loop(self):
+        """Render stage: applies the newest overlay update."""
+        while self.running:
+            command, payload = self.render_queue.get()
+            if command == "stats":
+                self.overlay.update_stats(payload)
+                continue
+            with self.metrics.timer("overlay_update"):
+                if command == "update":
+                    self.overlay.update_outcomes(payload)
+                else:
+                    self.overlay.clear_outcomes()
+
+    def run_stage(self, name, stage):
+        """Runs a pipeline stage, shutting the whole pipeline down if it fails."""
+        try:
+            stage()
+        except QueueClosed:
+            pass
         except Exception as e:
-            print(f"\n--- An unexpected error occurred in the main OCR loop ---")
+            print(f"\n--- An unexpected error occurred in the {name} stage ---")
             print(e)
             print("----------------------------------------------------------\n")
+            self.stop()
+
+    def stop(self):
+        """Stops every pipeline stage."""
+        self.running = False
+        for queue in (self.frame_queue, self.ocr_queue, self.render_queue):
+            queue.close()
+
+    def main_loop(self):
+        """Runs the capture, OCR and lookup stages on their own threads and renders on this one."""
+        if not self.engine_ok:
+            print("OCR engine did not start due to an initialization error.")
+            return
+
+        print(f"Starting OCR engine. Initial state: {self.current_state}")
+
+        self.running = True
+        self.pipelined = True
+        stages = [("capture", self.capture_loop), ("OCR", self.ocr_loop), ("lookup", self.lookup_loop)]
+        for name, stage in stages:
+            thread = threading.Thread(target=self.run_stage, args=(name, stage), name=f"umabuddy-{name}")
+            thread.daemon = True
+            thread.start()
+
+        self.run_stage("render", self.render_loop)
 
 
 def run_ocr_engine(overlay_widget):
@@ -0,0 +1,126 @@
+import json
+import threading
+
+import startup
+
+# Model options read from settings.json
+DEFAULT_QUANTIZE = True
+# 0 leaves torch's default of one thread per core
+DEFAULT_TORCH_THREADS = 0
+
+# Filled in by the warm-up thread
+_reader = None
+_error = None
+_ready = threading.Event()
+_started = False
+_start_lock = threading.Lock()
+
+# torch's own thread count, recorded before the first reader changes it
+_default_threads = None
+
+
+def load_settings(path="settings.json"):
+    """Reads the model options from settings.json, if there is one yet."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def create_reader(settings):
+    """
+    Creates the EasyOCR reader described by settings.json.
+
+    "ocr_quantize" runs the models with int8 dynamic quantization on CPU,
+    "torch_threads" caps the threads torch uses so OCR leaves cores for the
+    game, and the text detector is only loaded when ocr_mode needs it.
+    """
+    import easyocr
+    from ocr_logic import DEFAULT_OCR_MODE
+
+    global _default_threads
+    import torch
+    if _default_threads is None:
+        _default_threads = torch.get_num_threads()
+    # The thread count is process-wide, so 0 has to undo an earlier reader's cap
+    threads = int(settings.get('torch_threads', DEFAULT_TORCH_THREADS) or 0)
+    torch.set_num_threads(threads if threads > 0 else _default_threads)
+
+    return easyocr.Reader(['en'],
+                          quantize=bool(settings.get('ocr_quantize', DEFAULT_QUANTIZE)),
+                          detector=settings.get('ocr_mode', DEFAULT_OCR_MODE) == "detect")
+
+
+def warm_up(reader):
+    """Runs the loaded models once so the first real frame doesn't pay for lazy initialization inside torch."""
+    import cv2
+    import numpy as np
+    dummy = np.full((64, 320, 3), 255, dtype=np.uint8)
+    cv2.putText(dummy, "Warm Up", (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    if getattr(reader, 'detector', None) is not None:
+        reader.readtext(dummy)
+    else:
+        reader.recognize(cv2.cvtColor(dummy, cv2.COLOR_RGB2GRAY), horizontal_list=[[0, 320, 0, 64]], free_list=[])
+
+
+def start_warmup(settings=None):
+    """
+    Starts loading the OCR modules and the EasyOCR model on a background thread.
+
+    Safe to call more than once; only the first call starts the thread.
+
+    Args:
+        settings (dict): Settings to take the model options from instead of settings.json.
+    """
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+
+    thread = threading.Thread(target=_warmup, args=(settings,), name="umabuddy-warmup")
+    thread.daemon = True
+    thread.start()
+
+
+def _warmup(settings):
+    global _reader, _error
+    try:
+        if settings is None:
+            settings = load_settings()
+        with startup.phase("import OCR engine modules"):
+            import ocr_logic  # noqa: F401 (pulls in cv2, numpy, pynput)
+        with startup.phase("import easyocr/torch"):
+            import easyocr  # noqa: F401
+        with startup.phase("load EasyOCR models"):
+            print("Initializing EasyOCR... (This may take a moment)")
+            # This is the line that will trigger the one-time model download.
+            reader = create_reader(settings)
+        with startup.phase("warm-up inference"):
+            warm_up(reader)
+        _reader = reader
+        print("EasyOCR initialized successfully.")
+    except Exception as e:
+        _error = e
+        print(f"EasyOCR warm-up failed: {e}")
+    finally:
+        _ready.set()
+        startup.report()
+
+
+def get_reader(settings=None):
+    """
+    Returns the warmed-up EasyOCR reader, waiting for the warm-up to finish.
+
+    Args:
+        settings (dict): Model options to use if the warm-up hasn't started yet.
+
+    Raises:
+        RuntimeError: If the reader could not be created.
+    """
+    start_warmup(settings)
+    _ready.wait()
+    if _reader is None:
+        raise RuntimeError(f"EasyOCR could not be initialized: {_error}")
+    return _reader
@@ -0,0 +1,91 @@
+import threading
+from collections import deque
+
+
+class QueueClosed(Exception):
+    """Raised by DropOldestQueue.get once the queue is closed and empty."""
+
+
+class DropOldestQueue:
+    """
+    A bounded queue that throws away its oldest item instead of blocking when full.
+
+    Producers never wait on a slow consumer, and a consumer that falls behind
+    only ever sees the most recent items.
+    """
+
+    def __init__(self, maxsize=1):
+        self.items = deque(maxlen=maxsize)
+        self.cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        """Adds an item, dropping the oldest one if the queue is full."""
+        with self.cond:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+            self.items.append(item)
+            self.cond.notify()
+
+    def get(self, timeout=None):
+        """
+        Removes and returns the oldest item, waiting for one if the queue is empty.
+
+        Args:
+            timeout (float): Seconds to wait, or None to wait forever.
+
+        Returns:
+            The item, or None if the timeout expired.
+
+        Raises:
+            QueueClosed: If the queue was closed and has nothing left.
+        """
+        with self.cond:
+            if not self.items and not self.closed:
+                self.cond.wait(timeout)
+            if self.items:
+                return self.items.popleft()
+            if self.closed:
+                raise QueueClosed()
+            return None
+
+    def clear(self):
+        """Drops everything currently waiting in the queue."""
+        with self.cond:
+            self.items.clear()
+
+    def close(self):
+        """Wakes up all consumers; get raises QueueClosed once the queue is drained."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class Frame:
+    """Regions captured in one tick."""
+
+    __slots__ = ("index", "timestamp", "regions")
+
+    def __init__(self, index, timestamp, regions):
+        self.index = index
+        self.timestamp = timestamp
+        self.regions = regions
+
+
+class OcrResult:
+    """Text recognized in one region of a frame, tagged with the state it was read for."""
+
+    __slots__ = ("frame", "state", "region", "cleaned_text", "results", "banner_key", "from_cache", "event_title")
+
+    def __init__(self, frame, state, region, cleaned_text, results=None, banner_key=None, from_cache=False,
+                 event_title=None):
+        self.frame = frame
+        self.state = state
+        self.region = region
+        self.cleaned_text = cleaned_text
+        self.results = results
+        self.banner_key = banner_key
+        self.from_cache = from_cache
+        # Exact title the text was resolved to ("" for none), or None if it wasn't resolved
+        self.event_title = event_title
@@ -0,0 +1,63 @@
+import cv2
+
+# Height (in px) of the lines EasyOCR's recognizer is trained on; crops are
+# scaled to this height before recognition anyway
+RECOGNIZER_HEIGHT = 64
+
+# A region whose darkest and brightest pixels differ by less than this holds no text
+MIN_TEXT_CONTRAST = 24
+
+DEFAULT_PREPROCESS = {
+    "grayscale": True,
+    "normalize_contrast": True,
+    "binarize": False,
+    "resize": True,
+}
+
+
+class Preprocessor:
+    """
+    Turns a captured BGRA region into the image handed to the recognizer.
+
+    Every step can be switched off in the "preprocess" block of settings.json:
+    grayscale conversion, min-max contrast normalization, Otsu binarization and
+    resizing to the recognizer's native line height.
+    """
+
+    def __init__(self, config=None, target_height=RECOGNIZER_HEIGHT):
+        options = dict(DEFAULT_PREPROCESS, **(config or {}))
+        self.grayscale = bool(options["grayscale"])
+        self.normalize_contrast = bool(options["normalize_contrast"])
+        # Binarizing only makes sense on a single channel
+        self.binarize = bool(options["binarize"]) and self.grayscale
+        self.target_height = int(options.get("target_height", target_height)) if options["resize"] else None
+
+    def apply(self, img_bgra):
+        """
+        Args:
+            img_bgra (np.ndarray): An HxWx4 BGRA region, as returned by the capture backend.
+
+        Returns:
+            A tuple of (image, has_contrast): a uint8 grayscale or RGB image and
+            whether it has enough contrast to possibly hold text.
+        """
+        if self.grayscale:
+            img = cv2.cvtColor(img_bgra, cv2.COLOR_BGRA2GRAY)
+        else:
+            img = cv2.cvtColor(img_bgra, cv2.COLOR_BGRA2RGB)
+
+        low, high = float(img.min()), float(img.max())
+        if high - low < MIN_TEXT_CONTRAST:
+            return img, False
+
+        if self.normalize_contrast:
+            img = cv2.normalize(img, None, 0, 255, cv2.NORM_MINMAX)
+        if self.binarize:
+            _, img = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        if self.target_height and img.shape[0] != self.target_height:
+            scale = self.target_height / img.shape[0]
+            width = max(1, int(round(img.shape[1] * scale)))
+            # INTER_AREA for shrinking, INTER_CUBIC keeps glyph edges sharp when enlarging
+            interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+            img = cv2.resize(img, (width, self.target_height), interpolation=interpolation)
+        return img, True
@@ -0,0 +1,182 @@
+import argparse
+import glob
+import json
+import os
+import tempfile
+import time
+
+import database
+from pipeline import Frame
+from screen_capture import CropCapture, FileCapture, REGION_KEYS
+
+
+class StubOverlay:
+    """Stands in for OverlayWindow and remembers what would have been shown."""
+
+    def __init__(self):
+        self.outcomes = []
+        self.updates = 0
+        self.clears = 0
+
+    def update_outcomes(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.updates += 1
+
+    def clear_outcomes(self):
+        self.outcomes = []
+        self.clears += 1
+
+
+def load_manifest(path):
+    """
+    Reads a labelled replay manifest.
+
+    The manifest is JSON with a "frames" list, in playback order. Each frame has
+    either a "screenshot" path or per-region crop paths ("character_region",
+    "event_region"), plus optional labels: "character" (the character that
+    should be confirmed by then) and "event" (the event title that should be on
+    the overlay, or null for none). Paths are relative to the manifest.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    base = os.path.dirname(os.path.abspath(path))
+    frames = manifest["frames"]
+    for frame in frames:
+        for key in ("screenshot",) + REGION_KEYS:
+            if frame.get(key):
+                frame[key] = os.path.join(base, frame[key])
+    return frames
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def replay(settings, frames, warm_cache=False):
+    """
+    Feeds recorded frames through the same state machine as OcrEngine.main_loop.
+
+    Returns:
+        A dict of summary statistics.
+    """
+    from ocr_logic import OcrEngine
+
+    regions = {key: settings.get(key) for key in REGION_KEYS}
+    if all(frame.get("screenshot") for frame in frames):
+        capture = FileCapture(regions, [frame["screenshot"] for frame in frames], loop=False)
+    else:
+        capture = CropCapture(regions, [{key: frame.get(key) for key in REGION_KEYS} for frame in frames])
+
+    tmp_dir = None
+    if not warm_cache:
+        # Start from an empty banner cache so every run measures the same work
+        tmp_dir = tempfile.TemporaryDirectory()
+        settings = dict(settings, banner_cache_path=os.path.join(tmp_dir.name, "banner_cache.json"))
+
+    overlay = StubOverlay()
+    engine = OcrEngine(overlay, settings=settings, capture=capture, headless=True)
+    if not engine.engine_ok:
+        raise RuntimeError("OCR engine failed to initialize.")
+
+    latencies = []
+    event_total = event_correct = 0
+    character_total = character_correct = 0
+
+    started = time.perf_counter()
+    for index, labels in enumerate(frames):
+        frame_start = time.perf_counter()
+        frame = Frame(index, time.time(), capture.grab())
+        engine.process_frame(frame)
+        latencies.append((time.perf_counter() - frame_start) * 1000)
+
+        if "event" in labels:
+            event_total += 1
+            event_correct += engine.displayed_event == labels["event"]
+        if "character" in labels:
+            character_total += 1
+            confirmed = engine.current_state == engine.STATE_SEARCH_EVENT
+            character_correct += confirmed and engine.current_character_candidate == labels["character"]
+    elapsed = time.perf_counter() - started
+
+    if tmp_dir:
+        engine.banner_cache.save()
+        tmp_dir.cleanup()
+
+    latencies.sort()
+    return {
+        "frames": len(frames),
+        "elapsed_s": elapsed,
+        "throughput_fps": len(frames) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+        "ocr_runs": engine.frame_gate.runs,
+        "unchanged_skips": engine.frame_gate.skips,
+        "banner_cache_hits": engine.banner_cache.hits,
+        "lookups": engine.lookups,
+        "lookup_hit_rate": engine.lookup_hits / engine.lookups if engine.lookups else 0.0,
+        "event_accuracy": event_correct / event_total if event_total else None,
+        "character_accuracy": character_correct / character_total if character_total else None,
+        "overlay_updates": overlay.updates,
+    }
+
+
+def print_summary(summary):
+    latency = summary["latency_ms"]
+    print("\n--- Replay benchmark ---")
+    print(f"Frames:             {summary['frames']} in {summary['elapsed_s']:.2f}s "
+          f"({summary['throughput_fps']:.1f} frames/s)")
+    print(f"Latency per frame:  mean {latency['mean']:.1f} ms, p50 {latency['p50']:.1f} ms, "
+          f"p95 {latency['p95']:.1f} ms, p99 {latency['p99']:.1f} ms, max {latency['max']:.1f} ms")
+    print(f"OCR runs:           {summary['ocr_runs']} (skipped unchanged: {summary['unchanged_skips']}, "
+          f"banner cache hits: {summary['banner_cache_hits']})")
+    print(f"Lookups:            {summary['lookups']} (hit rate {summary['lookup_hit_rate']:.1%})")
+    for key, label in (("event_accuracy", "Event accuracy:"), ("character_accuracy", "Character accuracy:")):
+        if summary[key] is not None:
+            print(f"{label:<20}{summary[key]:.1%}")
+    print("------------------------\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded frames through the OCR engine without a display.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--manifest", help="Labelled manifest JSON (see load_manifest)")
+    source.add_argument("--screens", help="Directory of full screenshots to replay in name order, unlabelled")
+    parser.add_argument("--settings", default="settings.json", help="Settings file with the capture regions")
+    parser.add_argument("--db", default=database.DB_PATH, help="Event database to look events up in")
+    parser.add_argument("--warm-cache", action="store_true", help="Use the persistent banner cache")
+    parser.add_argument("--ocr-mode", choices=("recognize", "detect"), help="Override ocr_mode from the settings")
+    parser.add_argument("--json", help="Also write the summary to this file")
+    args = parser.parse_args()
+
+    with open(args.settings, "r") as f:
+        settings = json.load(f)
+    if args.ocr_mode:
+        settings["ocr_mode"] = args.ocr_mode
+
+    if args.manifest:
+        frames = load_manifest(args.manifest)
+    else:
+        frames = [{"screenshot": path} for path in sorted(glob.glob(os.path.join(args.screens, "*")))]
+    if not frames:
+        parser.error("No frames to replay.")
+
+    database.set_database_path(args.db)
+    summary = replay(settings, frames, warm_cache=args.warm_cache)
+    print_summary(summary)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import deque
+
+# Shortest and longest time (in seconds) between screen captures
+DEFAULT_MIN_INTERVAL = 0.15
+DEFAULT_MAX_INTERVAL = 2.0
+
+# Factor the interval grows by with every tick in which nothing changed
+DEFAULT_BACKOFF = 1.5
+
+# Seconds to keep polling at the fastest rate after a change; banners tend to follow each other closely
+DEFAULT_FAST_HOLD = 3.0
+
+# Share of wall time (in percent) the OCR stage may spend working
+DEFAULT_CPU_BUDGET = 25.0
+
+# Seconds of recent OCR work the budget is checked against
+BUDGET_WINDOW = 10.0
+
+
+class PollScheduler:
+    """
+    Decides how long the capture stage waits before grabbing the next frame.
+
+    Polls at min_interval while the regions are changing and for fast_hold
+    seconds afterwards, then backs off exponentially up to max_interval. The
+    interval is never shorter than what keeps the OCR stage's average time per
+    tick within cpu_budget percent of wall time.
+    """
+
+    def __init__(self, min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL,
+                 backoff=DEFAULT_BACKOFF, fast_hold=DEFAULT_FAST_HOLD, cpu_budget=DEFAULT_CPU_BUDGET,
+                 clock=time.monotonic):
+        self.min_interval = float(min_interval)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.backoff = max(1.0, float(backoff))
+        self.fast_hold = float(fast_hold)
+        self.cpu_budget = float(cpu_budget)
+        self.clock = clock
+
+        self.lock = threading.Lock()
+        self.interval = self.min_interval
+        self.last_active = clock()
+        self.started = self.last_active
+        # (time, seconds of OCR work) for every tick in the last BUDGET_WINDOW seconds
+        self.work = deque()
+        self.work_total = 0.0
+
+    def record(self, busy, active):
+        """
+        Reports one tick of the OCR stage.
+
+        Args:
+            busy (float): Seconds the OCR stage spent on the frame.
+            active (bool): Whether any region changed (or is still being voted on).
+        """
+        with self.lock:
+            now = self.clock()
+            self.work.append((now, busy))
+            self.work_total += busy
+            self._expire(now)
+            if active:
+                self.last_active = now
+                self.interval = self.min_interval
+            elif now - self.last_active >= self.fast_hold:
+                self.interval = min(self.max_interval, self.interval * self.backoff)
+
+    def wake(self):
+        """Goes back to the fastest rate, e.g. after the user reset the search."""
+        with self.lock:
+            self.last_active = self.clock()
+            self.interval = self.min_interval
+
+    def next_interval(self):
+        """Seconds between the start of this capture and the next one."""
+        with self.lock:
+            return max(self.interval, self._budget_interval())
+
+    def budget_use(self):
+        """OCR time over the last BUDGET_WINDOW seconds as a fraction of the budget (1.0 = all of it)."""
+        with self.lock:
+            now = self.clock()
+            self._expire(now)
+            elapsed = min(BUDGET_WINDOW, now - self.started)
+            if elapsed <= 0 or self.cpu_budget <= 0:
+                return 0.0
+            return self.work_total / elapsed / (self.cpu_budget / 100.0)
+
+    def report(self):
+        """A one-line readout of the tick rate and budget use."""
+        interval = self.next_interval()
+        return (f"Polling every {interval * 1000:.0f} ms ({1.0 / interval:.1f}/s), "
+                f"OCR using {self.budget_use():.0%} of its {self.cpu_budget:.0f}% CPU budget")
+
+    def _budget_interval(self):
+        # Average OCR time per tick, spread so it stays within the budget
+        if not self.work or self.cpu_budget <= 0:
+            return 0.0
+        return self.work_total / len(self.work) / (self.cpu_budget / 100.0)
+
+    def _expire(self, now):
+        while self.work and now - self.work[0][0] > BUDGET_WINDOW:
+            self.work_total -= self.work.popleft()[1]
+
+
+def create_scheduler(settings):
+    """Builds the PollScheduler described by the "polling" block of settings.json."""
+    config = settings.get('polling') or {}
+    return PollScheduler(min_interval=config.get('min_interval', DEFAULT_MIN_INTERVAL),
+                         max_interval=config.get('max_interval', DEFAULT_MAX_INTERVAL),
+                         backoff=config.get('backoff', DEFAULT_BACKOFF),
+                         fast_hold=config.get('fast_hold', DEFAULT_FAST_HOLD),
+                         cpu_budget=config.get('cpu_budget', DEFAULT_CPU_BUDGET))
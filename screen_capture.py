@@ -0,0 +1,274 @@
+import glob
+import os
+
+import numpy as np
+
+# Which backend create_capture uses when settings.json doesn't say
+DEFAULT_BACKEND = "mss"
+
+# Region keys in settings.json that get captured
+REGION_KEYS = ("character_region", "event_region")
+
+# Frame rate assumed for recordings that don't report one
+DEFAULT_VIDEO_FPS = 30.0
+
+
+class CaptureBackend:
+    """
+    Captures every configured region with a single grab per tick.
+
+    The bounding box that covers all regions is grabbed once as a BGRA frame
+    (the alpha channel is undefined) and each region is returned as a NumPy view
+    into that frame, so no per-region copies are made. Every grab returns a new
+    frame, so views stay valid for as long as something holds on to them.
+    """
+
+    def __init__(self, regions):
+        self.regions = {name: region for name, region in regions.items() if region}
+        if not self.regions:
+            raise ValueError("No capture regions are configured.")
+
+        self.left = min(r['left'] for r in self.regions.values())
+        self.top = min(r['top'] for r in self.regions.values())
+        right = max(r['left'] + r['width'] for r in self.regions.values())
+        bottom = max(r['top'] + r['height'] for r in self.regions.values())
+        self.width = right - self.left
+        self.height = bottom - self.top
+
+        # Where each region sits inside the grabbed frame
+        self.slices = {
+            name: (slice(r['top'] - self.top, r['top'] - self.top + r['height']),
+                   slice(r['left'] - self.left, r['left'] - self.left + r['width']))
+            for name, r in self.regions.items()
+        }
+
+    @property
+    def bbox(self):
+        """The grabbed area as (left, top, right, bottom) screen coordinates."""
+        return (self.left, self.top, self.left + self.width, self.top + self.height)
+
+    def grab_frame(self):
+        """Returns the bounding box of all regions as an HxWx4 BGRA array."""
+        raise NotImplementedError
+
+    def grab(self):
+        """
+        Grabs the screen once and splits it into the configured regions.
+
+        Returns:
+            A dict mapping region name to a BGRA view of that region.
+        """
+        frame = self.grab_frame()
+        return {name: frame[rows, cols] for name, (rows, cols) in self.slices.items()}
+
+    def close(self):
+        """Releases any resources held by the backend."""
+
+
+class MssCapture(CaptureBackend):
+    """Captures with mss, wrapping its pixel buffer without copying it."""
+
+    def __init__(self, regions):
+        super().__init__(regions)
+        import mss
+        self._mss_module = mss
+        self.sct = None
+        self.monitor = {'left': self.left, 'top': self.top, 'width': self.width, 'height': self.height}
+
+    def grab_frame(self):
+        # mss handles are tied to the thread that created them, so open lazily
+        # on whichever thread does the capturing.
+        if self.sct is None:
+            self.sct = self._mss_module.mss()
+        shot = self.sct.grab(self.monitor)
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def close(self):
+        if self.sct is not None:
+            self.sct.close()
+            self.sct = None
+
+
+class PilCapture(CaptureBackend):
+    """Captures with PIL.ImageGrab. Used when mss isn't installed."""
+
+    def grab_frame(self):
+        from PIL import ImageGrab
+        img_pil = ImageGrab.grab(bbox=self.bbox)
+        # Some platforms and multi-monitor setups grab RGBA, which the BGRX packer doesn't take
+        if img_pil.mode != "RGB":
+            img_pil = img_pil.convert("RGB")
+        # Pack straight into BGRA order so this backend matches the others
+        data = img_pil.tobytes("raw", "BGRX")
+        return np.frombuffer(data, dtype=np.uint8).reshape(img_pil.height, img_pil.width, 4)
+
+
+class FileCapture(CaptureBackend):
+    """
+    Reads full-screen screenshots from disk instead of the screen.
+
+    Each grab returns the next screenshot, cropped to the regions, so recorded
+    sessions can be played back on machines without a display. Screenshots may
+    be images that OpenCV can read or .npy arrays.
+    """
+
+    def __init__(self, regions, paths, loop=True):
+        super().__init__(regions)
+        if isinstance(paths, str):
+            paths = sorted(glob.glob(os.path.join(paths, "*"))) if os.path.isdir(paths) else [paths]
+        self.paths = list(paths)
+        if not self.paths:
+            raise ValueError("FileCapture needs at least one screenshot.")
+        self.loop = loop
+        self.position = 0
+        self.last_path = None
+        self.last_frame = None
+
+    def load(self, path):
+        """Loads a screenshot as a BGRA array, reusing it if it was the last one loaded."""
+        if path == self.last_path:
+            return self.last_frame
+
+        frame = load_bgra(path)
+        if frame.shape[0] < self.top + self.height or frame.shape[1] < self.left + self.width:
+            raise ValueError(f"Screenshot {path} is smaller than the configured regions.")
+        self.last_path, self.last_frame = path, frame
+        return frame
+
+    @property
+    def exhausted(self):
+        """True once every screenshot has been returned and looping is off."""
+        return not self.loop and self.position >= len(self.paths)
+
+    def grab_frame(self):
+        if self.exhausted:
+            raise EOFError("No screenshots left to replay.")
+        path = self.paths[self.position % len(self.paths)]
+        self.position += 1
+        if self.loop:
+            self.position %= len(self.paths)
+        frame = self.load(path)
+        return frame[self.top:self.top + self.height, self.left:self.left + self.width]
+
+
+class CropCapture(CaptureBackend):
+    """
+    Replays region crops that were saved separately instead of full screenshots.
+
+    Each grab returns the crops of the next recorded frame. Regions missing
+    from a frame are left out of the result.
+    """
+
+    def __init__(self, regions, frames):
+        super().__init__(regions)
+        # One dict per frame, mapping region name to the crop's file path
+        self.recorded = list(frames)
+        self.position = 0
+
+    @property
+    def exhausted(self):
+        """True once every recorded frame has been returned."""
+        return self.position >= len(self.recorded)
+
+    def grab(self):
+        if self.exhausted:
+            raise EOFError("No recorded frames left to replay.")
+        paths = self.recorded[self.position]
+        self.position += 1
+        return {name: load_bgra(path) for name, path in paths.items() if path}
+
+
+class VideoFileCapture(CaptureBackend):
+    """
+    Reads frames from a screen recording instead of the screen.
+
+    Anything cv2.VideoCapture can open works: video files, or image sequences
+    given as a printf-style pattern (e.g. "frames/%05d.png"). Each grab decodes
+    the next frame after skipping `stride - 1` frames without converting them.
+    """
+
+    def __init__(self, regions, path, stride=1, fps=None):
+        super().__init__(regions)
+        import cv2
+        self._cv2 = cv2
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise ValueError(f"Could not open video {path}")
+        self.fps = fps or self.capture.get(cv2.CAP_PROP_FPS) or DEFAULT_VIDEO_FPS
+        self.frame_count = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        self.stride = max(1, int(stride))
+        self.position = 0
+        # Index (in the video) of the frame returned by the last grab
+        self.last_index = -1
+        self.exhausted = False
+
+    @property
+    def timestamp(self):
+        """Seconds into the video of the frame returned by the last grab."""
+        return max(self.last_index, 0) / self.fps
+
+    def grab_frame(self):
+        if self.exhausted:
+            raise EOFError("No video frames left.")
+        if self.last_index >= 0:
+            for _ in range(self.stride - 1):
+                if not self.capture.grab():
+                    self.exhausted = True
+                    raise EOFError("No video frames left.")
+                self.position += 1
+
+        ok, frame = self.capture.read()
+        if not ok:
+            self.exhausted = True
+            raise EOFError("No video frames left.")
+        self.last_index = self.position
+        self.position += 1
+
+        if frame.shape[0] < self.top + self.height or frame.shape[1] < self.left + self.width:
+            raise ValueError("Video frames are smaller than the configured regions.")
+        # Only the area around the regions is converted
+        crop = frame[self.top:self.top + self.height, self.left:self.left + self.width]
+        return self._cv2.cvtColor(crop, self._cv2.COLOR_BGR2BGRA)
+
+    def close(self):
+        self.capture.release()
+
+
+def load_bgra(path):
+    """Reads an image file (or .npy array) from disk as a BGRA array."""
+    if path.endswith(".npy"):
+        return np.load(path)
+
+    import cv2
+    img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if img is None:
+        raise ValueError(f"Could not read image {path}")
+    if img.ndim == 2:
+        return cv2.cvtColor(img, cv2.COLOR_GRAY2BGRA)
+    if img.shape[2] == 3:
+        return cv2.cvtColor(img, cv2.COLOR_BGR2BGRA)
+    return img
+
+
+def create_capture(settings, backend=None):
+    """
+    Builds the capture backend named in settings.json ("mss", "pil" or "file").
+
+    Args:
+        settings (dict): Loaded settings.json contents.
+        backend (str): Overrides the capture_backend setting.
+
+    Returns:
+        A CaptureBackend covering character_region and event_region.
+    """
+    regions = {key: settings.get(key) for key in REGION_KEYS}
+    backend = backend or settings.get('capture_backend', DEFAULT_BACKEND)
+
+    if backend == "file":
+        return FileCapture(regions, settings.get('capture_files', "screenshots"))
+    if backend == "mss":
+        try:
+            return MssCapture(regions)
+        except ImportError:
+            print("mss is not installed, falling back to PIL.ImageGrab for screen capture.")
+    return PilCapture(regions)
@@ -0,0 +1,40 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Imported first by umabuddy.py, so this is as close to process start as we get
+PROCESS_START = time.perf_counter()
+
+_phases = []
+_lock = threading.Lock()
+
+
+@contextmanager
+def phase(name):
+    """Times a startup phase and records it for the startup report."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        with _lock:
+            _phases.append((name, start - PROCESS_START, end - start, threading.current_thread().name))
+
+
+def mark(name):
+    """Records a point in time (e.g. "settings window shown") with no duration."""
+    with _lock:
+        _phases.append((name, time.perf_counter() - PROCESS_START, 0.0, threading.current_thread().name))
+
+
+def report():
+    """Prints every recorded phase, in the order they started."""
+    with _lock:
+        phases = sorted(_phases, key=lambda p: p[1])
+
+    print("\n--- Startup time report ---")
+    print(f"{'phase':<34}{'start':>10}{'duration':>11}  thread")
+    for name, started, duration, thread_name in phases:
+        duration_text = f"{duration * 1000:8.0f} ms" if duration else f"{'-':>11}"
+        print(f"{name:<34}{started * 1000:7.0f} ms{duration_text}  {thread_name}")
+    print("---------------------------\n")
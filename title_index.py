@@ -0,0 +1,274 @@
+import heapq
+import re
+import time
+from collections import Counter, defaultdict, deque
+from itertools import chain
+
+from database import get_event_titles
+
+# Characters EasyOCR commonly confuses are folded together before matching
+CONFUSABLES = str.maketrans({'i': 'l', '1': 'l', '|': 'l', '0': 'o', '5': 's'})
+# str.maketrans can't map multi-character sequences, so those are handled separately
+MULTI_CHAR_CONFUSABLES = [("rn", "m"), ("vv", "w")]
+
+# Number of trigram-ranked candidates that get a full edit-distance comparison
+RERANK_CANDIDATES = 5
+
+# Default minimum confidence for a fuzzy match to be used
+DEFAULT_MIN_SCORE = 0.8
+
+# Character confirmation: a name read exactly confirms at once; a fuzzy read needs
+# CHARACTER_VOTES_NEEDED of the last CHARACTER_VOTE_WINDOW reads to agree
+DEFAULT_CHARACTER_MIN_SCORE = 0.75
+DEFAULT_CHARACTER_VOTE_WINDOW = 5
+DEFAULT_CHARACTER_VOTES_NEEDED = 3
+
+
+def fold(text):
+    """Lowercases text, collapses whitespace and folds OCR-confusable characters."""
+    text = re.sub(r'\s+', ' ', text.lower()).strip()
+    for sequence, replacement in MULTI_CHAR_CONFUSABLES:
+        text = text.replace(sequence, replacement)
+    return text.translate(CONFUSABLES)
+
+
+def trigrams(folded):
+    """Returns the set of padded character trigrams of an already folded string."""
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings (Myers' bit-parallel algorithm)."""
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+
+    # One bitmask per character of a, with a bit set at each position it occurs
+    peq = {}
+    for i, c in enumerate(a):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    mask = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    pv, mv, score = mask, 0, len(a)
+    for c in b:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score
+
+
+class _Scope:
+    """Trigram postings for the titles of one character (or 'Common')."""
+
+    def __init__(self, titles):
+        self.titles = list(titles)
+        self.folded = [fold(t) for t in self.titles]
+        self.gram_counts = []
+        self.postings = defaultdict(list)
+        for title_id, folded in enumerate(self.folded):
+            grams = trigrams(folded)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.postings[gram].append(title_id)
+
+
+def best_in_scopes(text, scopes):
+    """
+    Finds the title closest to some OCR text among the titles of a few scopes.
+
+    Returns:
+        A tuple of (title, confidence) where confidence is in [0, 1],
+        or (None, 0.0) if nothing shares enough with the text.
+    """
+    folded = fold(text)
+    if not folded:
+        return None, 0.0
+    query_grams = trigrams(folded)
+
+    # Rank candidates by Dice coefficient over shared trigrams
+    candidates = []
+    for scope in scopes:
+        shared = Counter(chain.from_iterable(scope.postings.get(gram, ()) for gram in query_grams))
+        for title_id, count in shared.items():
+            dice = 2.0 * count / (len(query_grams) + scope.gram_counts[title_id])
+            candidates.append((dice, scope, title_id))
+
+    if not candidates:
+        return None, 0.0
+
+    # Confirm the best few with a full edit distance
+    best_title, best_score = None, 0.0
+    for _, scope, title_id in heapq.nlargest(RERANK_CANDIDATES, candidates, key=lambda c: c[0]):
+        target = scope.folded[title_id]
+        distance = edit_distance(folded, target)
+        score = 1.0 - distance / max(len(folded), len(target))
+        if score > best_score:
+            best_title, best_score = scope.titles[title_id], score
+    return best_title, best_score
+
+
+class TitleIndex:
+    """In-memory approximate-match index over event titles, scoped per character."""
+
+    def __init__(self, titles_by_character):
+        self.scopes = {name: _Scope(titles) for name, titles in titles_by_character.items()}
+
+    @classmethod
+    def from_database(cls):
+        """Builds the index from every event title in umamusume_events.db."""
+        start = time.perf_counter()
+        index = cls(get_event_titles() or {})
+        total = sum(len(scope.titles) for scope in index.scopes.values())
+        print(f"Built fuzzy title index over {total} titles in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return index
+
+    def best_match(self, text, character_name):
+        """
+        Finds the event title closest to some OCR text, looking only at the
+        character's own events and the 'Common' events.
+
+        Args:
+            text (str): Cleaned OCR text.
+            character_name (str): The confirmed character.
+
+        Returns:
+            A tuple of (event_title, confidence) where confidence is in [0, 1],
+            or (None, 0.0) if nothing shares enough with the text.
+        """
+        scopes = [self.scopes[name] for name in dict.fromkeys((character_name, 'Common')) if name in self.scopes]
+        return best_in_scopes(text, scopes)
+
+    def character_names(self):
+        """Every character with events of its own."""
+        return {name for name in self.scopes if name != 'Common'}
+
+    def titles_for(self, character_name):
+        """Every title that can appear for a character: its own events and the 'Common' ones."""
+        titles = []
+        for name in dict.fromkeys((character_name, 'Common')):
+            scope = self.scopes.get(name)
+            if scope is not None:
+                titles.extend(scope.titles)
+        return titles
+
+    def vocabulary(self, character_name):
+        """Builds the EventVocabulary for a newly confirmed character."""
+        return EventVocabulary(self, character_name)
+
+
+class EventVocabulary:
+    """
+    The closed set of event titles that can show up once a character is confirmed.
+
+    Gives the OCR stage an allowlist of the characters those titles use, and
+    resolves what was read to one exact title so the lookup stage gets a
+    database key instead of free text.
+    """
+
+    def __init__(self, index, character_name):
+        self.index = index
+        self.character_name = character_name
+        self.titles = set(index.titles_for(character_name))
+        # None leaves the recognizer unconstrained when the character has no known events
+        used = set(''.join(self.titles))
+        self.allowlist = ''.join(sorted(used | {' '})) if used else None
+
+    def resolve(self, text, min_score):
+        """
+        Maps cleaned OCR text to the title it was most likely read from.
+
+        Returns:
+            A tuple of (event_title, confidence). event_title is "" when no
+            title is close enough to the text.
+        """
+        if text in self.titles:
+            return text, 1.0
+        title, score = self.index.best_match(text, self.character_name)
+        if title is None or score < min_score:
+            return "", score
+        return title, score
+
+
+class CharacterResolver:
+    """
+    Turns OCR reads of the character region into a confirmed character name.
+
+    Every read is matched against the roster of characters in the database, so
+    the confirmed name is always a valid key. A read that matches a name exactly
+    confirms it in a single frame; fuzzier reads are voted on over a short
+    sliding window so one noisy frame can't pick the wrong character.
+    """
+
+    def __init__(self, names, min_score=DEFAULT_CHARACTER_MIN_SCORE,
+                 window=DEFAULT_CHARACTER_VOTE_WINDOW, votes_needed=DEFAULT_CHARACTER_VOTES_NEEDED,
+                 exact_confirms=True):
+        """
+        Args:
+            exact_confirms (bool): Whether a read that matches a name exactly
+                confirms it without waiting for the vote.
+        """
+        self.roster = _Scope(sorted(names))
+        self.names = set(names)
+        self.min_score = min_score
+        self.votes_needed = votes_needed
+        self.exact_confirms = exact_confirms
+        self.votes = deque(maxlen=window)
+        # Last text observed, repeated for frames where the region didn't change
+        self.last_text = None
+
+    def match(self, text):
+        """
+        Returns:
+            A tuple of (character_name, confidence), with character_name None
+            if no name in the roster is close enough.
+        """
+        if text in self.names:
+            return text, 1.0
+        name, score = best_in_scopes(text, [self.roster])
+        if name is None or score < self.min_score:
+            return None, score
+        return name, score
+
+    def observe(self, text):
+        """
+        Adds one frame's read to the vote.
+
+        Returns:
+            The confirmed character name, or None while undecided.
+        """
+        self.last_text = text
+        name, score = self.match(text) if text else (None, 0.0)
+        self.votes.append(name)
+        if name is not None and ((score == 1.0 and self.exact_confirms)
+                                 or self.votes.count(name) >= self.votes_needed):
+            self.reset()
+            return name
+        return None
+
+    @property
+    def leader(self):
+        """The name with the most votes in the window so far, if any."""
+        counts = Counter(name for name in self.votes if name is not None)
+        return counts.most_common(1)[0][0] if counts else None
+
+    @property
+    def pending(self):
+        """Whether a vote is in progress."""
+        return any(name is not None for name in self.votes)
+
+    def reset(self):
+        self.votes.clear()
+        self.last_text = None
@@ -1,13 +1,28 @@
+import startup  # keep first: records when the process started
 import sys
-from PyQt6.QtWidgets import QApplication
-from gui_setup import SettingsWindow
+
+with startup.phase("import Qt and GUI modules"):
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QTimer
+    from gui_setup import SettingsWindow
+from ocr_warmup import start_warmup
+
+
+def on_event_loop_started():
+    """Starts loading EasyOCR in the background once the settings window can paint."""
+    startup.mark("event loop running")
+    start_warmup()
+
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    app.setQuitOnLastWindowClosed(False)
+    with startup.phase("create QApplication"):
+        app = QApplication(sys.argv)
+        app.setQuitOnLastWindowClosed(False)
 
-    settings_window = SettingsWindow()
-    settings_window.show()
+    with startup.phase("show settings window"):
+        settings_window = SettingsWindow()
+        settings_window.show()
 
-    sys.exit(app.exec())
+    QTimer.singleShot(0, on_event_loop_started)
 
+    sys.exit(app.exec())
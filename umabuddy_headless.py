@@ -0,0 +1,249 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import database
+from pipeline import Frame, OcrResult
+from screen_capture import CropCapture, FileCapture, VideoFileCapture, REGION_KEYS, DEFAULT_VIDEO_FPS
+
+# Frames queued per worker process, so workers never wait on the decoder
+IN_FLIGHT_PER_WORKER = 4
+
+
+class RecordingOverlay:
+    """Stands in for OverlayWindow and remembers the outcomes that would be shown."""
+
+    def __init__(self):
+        self.outcomes = []
+
+    def update_outcomes(self, outcomes):
+        self.outcomes = list(outcomes)
+
+    def clear_outcomes(self):
+        self.outcomes = []
+
+    def update_stats(self, text):
+        pass
+
+
+class EventWriter:
+    """Writes what the state machine did after each frame as JSON lines."""
+
+    def __init__(self, out):
+        self.out = out
+        self.records = 0
+        self.confirmations = 0
+        self.character_selects = 0
+        self.lookups = 0
+
+    def write(self, record):
+        self.out.write(json.dumps(record) + "\n")
+        self.records += 1
+
+    def after_frame(self, engine, frame):
+        base = {"time": round(frame.timestamp, 3), "frame": frame.index}
+        # An exact read of another character can leave the event state and confirm the new
+        # character on the same frame, so switches are counted rather than read off the state
+        if engine.character_selects != self.character_selects:
+            self.character_selects = engine.character_selects
+            self.write(dict(base, type="character_select"))
+        if engine.confirmations != self.confirmations:
+            self.confirmations = engine.confirmations
+            self.write(dict(base, type="character", character=engine.current_character_candidate))
+
+        if engine.lookups != self.lookups:
+            self.lookups = engine.lookups
+            if engine.displayed_event:
+                self.write(dict(base, type="event", character=engine.current_character_candidate,
+                                event=engine.displayed_event, outcomes=engine.overlay.outcomes))
+            else:
+                # Read as an event but not in the database: what a coverage audit is looking for
+                self.write(dict(base, type="unknown_event", character=engine.current_character_candidate,
+                                text=engine.last_seen_event))
+
+
+def open_source(path, regions, stride, fps):
+    """
+    Opens a recording: a video file, a printf-style image sequence pattern, or a
+    directory of screenshots (read in name order).
+
+    Returns:
+        A tuple of (capture, rate at which frames are read, in frames per second of footage).
+    """
+    if os.path.isdir(path):
+        paths = sorted(glob.glob(os.path.join(path, "*")))[::max(1, stride)]
+        if not paths:
+            raise ValueError(f"No screenshots in {path}")
+        return FileCapture(regions, paths, loop=False), (fps or DEFAULT_VIDEO_FPS) / max(1, stride)
+    capture = VideoFileCapture(regions, path, stride=stride, fps=fps)
+    return capture, capture.fps / capture.stride
+
+
+def read_frames(capture, frame_rate):
+    """Yields every frame of the recording, with its time in seconds as the timestamp."""
+    index = 0
+    while True:
+        try:
+            regions = capture.grab()
+        except EOFError:
+            return
+        timestamp = capture.timestamp if isinstance(capture, VideoFileCapture) else index / frame_rate
+        yield Frame(index, timestamp, regions)
+        index += 1
+
+
+# --- Worker processes ---
+
+_worker_engine = None
+
+
+def init_worker(settings, db_path, tmp_dir):
+    """
+    Process-pool initializer: each worker gets its own engine and EasyOCR reader.
+
+    Args:
+        settings (dict): The parent's settings.
+        db_path (str): Event database the parent looks events up in.
+        tmp_dir (str): Directory (removed by the parent) for the worker's banner cache.
+    """
+    global _worker_engine
+    from ocr_logic import OcrEngine
+
+    # Spawned workers start with the default database path, not the parent's
+    database.set_database_path(db_path)
+
+    # Workers see every Nth frame, so comparing a region with the worker's previous frame
+    # says nothing; they read every region of every frame and leave the rest to the parent.
+    settings = dict(settings, change_threshold=-1, watch_character_region=True,
+                    banner_cache_path=os.path.join(tmp_dir, f"banner_cache_{os.getpid()}.json"))
+    regions = {key: settings.get(key) for key in REGION_KEYS}
+    _worker_engine = OcrEngine(RecordingOverlay(), settings=settings,
+                               capture=CropCapture(regions, []), headless=True)
+
+
+def read_regions(index, regions):
+    """Process-pool task: OCRs every region of one frame."""
+    engine = _worker_engine
+    results = engine.recognize(Frame(index, 0.0, regions), engine.STATE_SEARCH_EVENT)
+    return [(r.region, r.cleaned_text, r.results) for r in results]
+
+
+def apply_worker_results(engine, frame, fields):
+    """Feeds one frame's OCR results from a worker through the parent's state machine."""
+    state = engine.current_state
+    watched = engine.watched_regions(state)
+    results = []
+    for region, cleaned_text, ocr_results in fields:
+        if region not in watched:
+            continue
+        event_title = None
+        if region == 'event_region' and engine.event_vocabulary and cleaned_text:
+            event_title, _ = engine.event_vocabulary.resolve(cleaned_text, engine.fuzzy_min_score)
+        results.append(OcrResult(frame, state, region, cleaned_text, ocr_results, event_title=event_title))
+    results.sort(key=lambda r: r.region != 'character_region')
+    for result in results:
+        engine.handle_result(result)
+
+
+def process(engine, capture, frame_rate, writer, workers, db_path, tmp_dir):
+    """
+    Runs the whole recording through the engine; returns the number of frames read.
+
+    Args:
+        db_path (str): Event database the workers look events up in.
+        tmp_dir (str): Directory for the workers' banner caches.
+    """
+    frames = 0
+    if workers <= 1:
+        for frame in read_frames(capture, frame_rate):
+            engine.process_frame(frame)
+            writer.after_frame(engine, frame)
+            frames += 1
+        return frames
+
+    # OCR runs in parallel; the state machine still sees the frames one by one, in order
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(engine.settings, db_path, tmp_dir)) as pool:
+        pending = deque()
+
+        def finish_oldest():
+            frame, future = pending.popleft()
+            apply_worker_results(engine, frame, future.result())
+            writer.after_frame(engine, frame)
+
+        for frame in read_frames(capture, frame_rate):
+            # Regions are views into the decoded frame; workers get compact copies
+            regions = {name: np.ascontiguousarray(img) for name, img in frame.regions.items()}
+            pending.append((Frame(frame.index, frame.timestamp, {}), pool.submit(read_regions, frame.index, regions)))
+            frames += 1
+            while len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                finish_oldest()
+        while pending:
+            finish_oldest()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run recorded gameplay through the OCR engine without a display and write the events as JSONL.")
+    parser.add_argument("input", help="Video file, image sequence pattern (e.g. frames/%%05d.png) or screenshot folder")
+    parser.add_argument("--output", default="events.jsonl", help="JSONL file to write (- for stdout)")
+    parser.add_argument("--settings", default="settings.json", help="Settings file with the capture regions")
+    parser.add_argument("--db", default=database.DB_PATH, help="Event database to look events up in")
+    parser.add_argument("--stride", type=int, default=1, help="Only read every Nth frame")
+    parser.add_argument("--fps", type=float, help="Frame rate, for recordings that don't report one")
+    parser.add_argument("--workers", type=int, default=1, help="OCR worker processes (each loads its own model)")
+    args = parser.parse_args()
+
+    with open(args.settings, "r") as f:
+        settings = json.load(f)
+    database.set_database_path(args.db)
+
+    # Replays start from an empty banner cache of their own, so the live one neither
+    # changes the output nor picks up entries from the recording
+    tmp_dir = tempfile.TemporaryDirectory()
+    settings = dict(settings, banner_cache_path=os.path.join(tmp_dir.name, "banner_cache.json"))
+
+    regions = {key: settings.get(key) for key in REGION_KEYS}
+    try:
+        capture, frame_rate = open_source(args.input, regions, args.stride, args.fps)
+    except ValueError as e:
+        parser.error(str(e))
+
+    from ocr_logic import OcrEngine
+    # With worker processes, only the workers need an EasyOCR model
+    engine = OcrEngine(RecordingOverlay(), settings=settings, capture=capture, headless=True,
+                       load_reader=args.workers <= 1)
+    if not engine.engine_ok:
+        sys.exit("OCR engine failed to initialize.")
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    writer = EventWriter(out)
+    started = time.perf_counter()
+    try:
+        frames = process(engine, capture, frame_rate, writer, args.workers, args.db, tmp_dir.name)
+    finally:
+        capture.close()
+        if out is not sys.stdout:
+            out.close()
+        # Saved now, while its directory still exists, so there is nothing left to save at exit
+        engine.banner_cache.save()
+        tmp_dir.cleanup()
+    elapsed = time.perf_counter() - started
+
+    footage = frames / frame_rate
+    print(f"\nRead {frames} frames ({footage:.0f}s of footage) in {elapsed:.1f}s "
+          f"({footage / elapsed if elapsed else 0.0:.1f}x real time), wrote {writer.records} records "
+          f"to {args.output}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()